@@ -3,3 +3,12 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from . import signals  # noqa: F401
+        from .db import configure_sqlite
+        from .metrics import install_query_counter
+        
+        connection_created.connect(configure_sqlite, dispatch_uid='api.configure_sqlite')
+        connection_created.connect(install_query_counter, dispatch_uid='api.install_query_counter')
@@ -0,0 +1,171 @@
+"""
+Native async variants of the read-heavy endpoints, served under /api/async/.
+
+They use the async ORM directly so an in-flight request does not hold a
+worker thread under an ASGI server. Payloads match the DRF views.
+"""
+import asyncio
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import APIException, NotFound
+from organizations.models import Organization
+from donations.models import Donation, GlobalStats
+from . import cache as api_cache
+from . import conditional, health, live
+from .pagination import apaginate
+from .payloads import stats_payload
+from .serializers import DonationSerializer, OrganizationDetailSerializer, OrganizationListSerializer, detail_context
+from .views import (
+    category_stats_payload, donation_stats_validators, filter_donations, filter_organizations, health_payload,
+)
+
+
+def api_errors(view):
+    """Render DRF API exceptions (NotFound, ...) as the DRF views do, not as Django's HTML error pages"""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            return await view(request, *args, **kwargs)
+        except APIException as exc:
+            return JsonResponse({'detail': exc.detail}, status=exc.status_code)
+    return wrapper
+
+
+@require_GET
+@api_errors
+async def organization_list(request):
+    queryset = filter_organizations(Organization.objects.defer('donor_sketch'), request.GET)
+    etag = conditional.make_etag(request, await conditional.astats_version())
+    not_modified = conditional.not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    key = api_cache.response_key('list', request, etag)
+    data = await api_cache.aget_response(key)
+    if data is None:
+        items, data = await apaginate(request, queryset)
+        data['results'] = OrganizationListSerializer(items, many=True).data
+        await api_cache.aset_response(key, data)
+    return conditional.set_validators(JsonResponse(data), request, etag)
+
+
+@require_GET
+@api_errors
+async def organization_detail(request, pk):
+    updated_at = await Organization.objects.filter(pk=pk).values_list('updated_at', flat=True).afirst()
+    if updated_at is None:
+        raise NotFound()
+    context = detail_context(request.GET)
+    etag, last_modified = conditional.organization_validators(
+        request, updated_at, clock=context['embed_updates'] or context['client_dates']
+    )
+    not_modified = conditional.not_modified(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    key = api_cache.response_key('detail', request, etag)
+    data = await api_cache.aget_response(key)
+    if data is None:
+        queryset = Organization.objects.defer('donor_sketch').prefetch_related('impacts')
+        if context['embed_updates']:
+            queryset = queryset.prefetch_related('updates')
+        try:
+            org = await queryset.aget(pk=pk)
+        except Organization.DoesNotExist:
+            raise NotFound()
+        data = OrganizationDetailSerializer(org, context=context).data
+        await api_cache.aset_response(key, data)
+    return conditional.set_validators(JsonResponse(data), request, etag, last_modified)
+
+
+@require_GET
+@api_errors
+async def donation_list(request):
+    etag = await conditional.adonation_etag(request)
+    not_modified = conditional.not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    queryset = Donation.objects.select_related('organization').defer(
+        'organization__long_description', 'organization__description', 'organization__donor_sketch'
+    )
+    queryset = filter_donations(queryset, request.GET)
+    items, data = await apaginate(request, queryset)
+    data['results'] = DonationSerializer(items, many=True).data
+    return conditional.set_validators(JsonResponse(data), request, etag)
+
+
+@require_GET
+async def donation_stats(request):
+    stats = await GlobalStats.objects.filter(pk=GlobalStats.SINGLETON_ID).afirst() or GlobalStats(pk=GlobalStats.SINGLETON_ID)
+
+    category = request.GET.get('category')
+    etag, last_modified = donation_stats_validators(request, stats, category)
+    not_modified = conditional.not_modified(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    if category:
+        exact = request.GET.get('exact', '').lower() == 'true'
+        # Sketch merges and several aggregates: one worker thread for the lot rather than a hop per query
+        payload = await sync_to_async(category_stats_payload)(category, exact=exact)
+        return conditional.set_validators(JsonResponse(payload), request, etag)
+    return conditional.set_validators(JsonResponse(stats_payload(stats)), request, etag, last_modified)
+
+
+@require_GET
+async def health_check(request):
+    # Probes block on their thread pool, so wait for them off the event loop
+    report, _ = await sync_to_async(health.readiness, thread_sensitive=False)()
+    response = JsonResponse(health_payload(report))
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+async def _event_stream(channels):
+    # Subscribed here rather than in the view, so queues belong to the loop that serves the stream
+    subscription = live.subscribe(channels)
+    try:
+        yield f'retry: {settings.LIVE_RETRY_MS}\n\n'.encode()
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.get(), settings.LIVE_HEARTBEAT)
+            except asyncio.TimeoutError:
+                # Comment line; keeps proxies from timing out an idle stream
+                yield b': keepalive\n\n'
+                continue
+            if message is None:
+                return
+            yield message
+    finally:
+        subscription.close()
+
+
+@require_GET
+async def live_feed(request):
+    """
+    Server-Sent Events for completed donations. ?organization=<id> streams
+    that organization's 'donation' and 'organization' (new raised/donors)
+    events; without it, every donation and organization event plus 'stats'.
+    Needs an ASGI server: under WSGI the stream would hold a worker forever
+    (and never flush), so there it answers 503 and EventSource gives up.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'The live feed needs the ASGI server (config.asgi)'}, status=503)
+    
+    org_id = request.GET.get('organization')
+    if org_id is not None and not org_id.isdigit():
+        return JsonResponse({'error': 'organization must be an integer id'}, status=400)
+    
+    if org_id:
+        channels = [live.organization_channel(int(org_id))]
+    else:
+        channels = [live.DONATIONS_CHANNEL, live.STATS_CHANNEL]
+    response = StreamingHttpResponse(_event_stream(channels), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
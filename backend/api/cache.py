@@ -0,0 +1,44 @@
+"""
+Response cache for the organization list and detail.
+
+Entries are keyed by the response's ETag (api.conditional), which is built
+from one version row lookup (GlobalStats.version for lists, the
+organization's updated_at for details). A hit therefore still costs that
+primary-key query, but skips the filtered queryset, related lookups and
+serialization. A write changes the key on every worker at once and nothing
+has to be invalidated; superseded entries expire after API_CACHE_TIMEOUT.
+"""
+import hashlib
+from django.conf import settings
+from django.core.cache import caches
+
+
+def _cache():
+    return caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+
+def request_digest(request):
+    """Host, path and query string, which together determine a GET response (next links are absolute)"""
+    query = getattr(request, 'query_params', None) or request.GET
+    params = sorted(query.lists())
+    return hashlib.md5(repr((request.get_host(), request.path, params)).encode()).hexdigest()
+
+
+def response_key(kind, request, etag):
+    return f'api:{kind}:{etag}:{request_digest(request)}'
+
+
+def get_response(key):
+    return _cache().get(key)
+
+
+def set_response(key, data):
+    _cache().set(key, data, getattr(settings, 'API_CACHE_TIMEOUT', 300))
+
+
+async def aget_response(key):
+    return await _cache().aget(key)
+
+
+async def aset_response(key, data):
+    await _cache().aset(key, data, getattr(settings, 'API_CACHE_TIMEOUT', 300))
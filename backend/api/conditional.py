@@ -0,0 +1,113 @@
+"""
+Conditional GET (ETag / Last-Modified -> 304) and per-route Cache-Control.
+
+Validators are read from the database, never from per-process state, so
+every worker agrees on them the moment a write commits. Each is a single
+indexed row lookup, bumped by the writes it covers; a 304 skips the
+queryset, the response cache and serialization:
+
+- organization detail, updates and timeseries: Organization.updated_at,
+  which completions and impact/update edits also advance
+- organization list and category stats/timeseries: GlobalStats.version,
+  bumped with every completion, donation edit or delete and organization
+  create, edit or delete
+- donations: GlobalStats.version plus the newest donation id, which new
+  rows (including bulk imports) move without a version bump
+
+The response cache is keyed by the same ETag, so a cached body always
+matches the validator it is served with.
+
+Responses with humanized dates or a server 'now' also roll over every
+API_CACHE_TIMEOUT seconds, the staleness the response cache already allows.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.db.models import Subquery
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from donations.models import Donation, GlobalStats
+from . import cache as api_cache
+
+
+def make_etag(request, *parts):
+    """ETag over the request's host, path and query plus the given state"""
+    return quote_etag(hashlib.md5(repr((api_cache.request_digest(request),) + parts).encode()).hexdigest())
+
+
+def clock_window():
+    """Start of the current API_CACHE_TIMEOUT-long window"""
+    window = max(1, int(getattr(settings, 'API_CACHE_TIMEOUT', 300)))
+    return datetime.fromtimestamp(time.time() // window * window, dt_timezone.utc)
+
+
+def organization_validators(request, updated_at, clock=False):
+    parts = (updated_at.isoformat(),)
+    last_modified = updated_at
+    if clock:
+        window = clock_window()
+        parts += (window.isoformat(),)
+        last_modified = max(updated_at, window)
+    return make_etag(request, *parts), last_modified
+
+
+def _version_query():
+    return GlobalStats.objects.filter(pk=GlobalStats.SINGLETON_ID).values_list('version', flat=True)
+
+
+def stats_version():
+    """GlobalStats.version, by primary key; None until the row exists"""
+    return _version_query().first()
+
+
+async def astats_version():
+    return await _version_query().afirst()
+
+
+def _donation_state_query():
+    return GlobalStats.objects.filter(pk=GlobalStats.SINGLETON_ID).annotate(
+        last_id=Subquery(Donation.objects.order_by('-id').values('id')[:1]),
+    ).values_list('version', 'last_id')
+
+
+def donation_etag(request):
+    return make_etag(request, _donation_state_query().first())
+
+
+async def adonation_etag(request):
+    return make_etag(request, await _donation_state_query().afirst())
+
+
+def cache_policy(request):
+    """API_CACHE_CONTROL entry for the matched route; async routes share their sync twin's"""
+    match = request.resolver_match
+    name = match.url_name if match else None
+    if name and name.startswith('async-'):
+        name = name[len('async-'):]
+    return getattr(settings, 'API_CACHE_CONTROL', {}).get(name)
+
+
+def not_modified(request, etag, last_modified=None):
+    """A 304 carrying the validators if the client's copy is current, else None"""
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        # HTTP dates have whole-second precision
+        last_modified=int(last_modified.timestamp()) if last_modified else None
+    )
+    if response is not None and response.status_code == 304:
+        set_validators(response, request, etag, last_modified)
+    return response
+
+
+def set_validators(response, request, etag, last_modified=None):
+    if response.status_code not in (200, 304):
+        return response
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    policy = cache_policy(request)
+    if policy:
+        response['Cache-Control'] = policy
+    return response
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+SQLITE_JOURNAL_MODES = {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'}
+SQLITE_SYNCHRONOUS = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """connection_created handler: journal mode, busy timeout and sync level for SQLite connections"""
+    if connection.vendor != 'sqlite':
+        return
+
+    journal_mode = settings.SQLITE_JOURNAL_MODE.upper()
+    synchronous = settings.SQLITE_SYNCHRONOUS.upper()
+    if journal_mode and journal_mode not in SQLITE_JOURNAL_MODES:
+        raise ImproperlyConfigured(f'DB_SQLITE_JOURNAL_MODE must be one of {sorted(SQLITE_JOURNAL_MODES)}')
+    if synchronous and synchronous not in SQLITE_SYNCHRONOUS:
+        raise ImproperlyConfigured(f'DB_SQLITE_SYNCHRONOUS must be one of {sorted(SQLITE_SYNCHRONOUS)}')
+
+    timeout_ms = int(connection.settings_dict.get('OPTIONS', {}).get('timeout', 5) * 1000)
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA busy_timeout = {timeout_ms}')
+        # In-memory test databases can't use WAL and keep their own mode
+        if journal_mode and not connection.is_in_memory_db():
+            cursor.execute(f'PRAGMA journal_mode = {journal_mode}')
+        if synchronous:
+            cursor.execute(f'PRAGMA synchronous = {synchronous}')
+
+
+def describe_connection(connection):
+    """Settings that matter for write throughput, for benchmark output"""
+    profile = {
+        'vendor': connection.vendor,
+        'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE'),
+        'health_checks': connection.settings_dict.get('CONN_HEALTH_CHECKS'),
+        'pool': getattr(settings, 'DB_POOL', 'none') if connection.vendor == 'postgresql' else None,
+    }
+    if connection.vendor == 'sqlite':
+        profile['transaction_mode'] = connection.settings_dict.get('TRANSACTION_MODE') or 'DEFERRED'
+        with connection.cursor() as cursor:
+            for pragma in ('journal_mode', 'busy_timeout', 'synchronous'):
+                cursor.execute(f'PRAGMA {pragma}')
+                profile[pragma] = cursor.fetchone()[0]
+    return profile
@@ -0,0 +1,108 @@
+"""
+Dependency probes for the readiness endpoint.
+
+Probes run in parallel on a small thread pool, each bounded by
+HEALTH_PROBE_TIMEOUT, and the combined report is kept in process memory
+for HEALTH_CACHE_TTL seconds. Concurrent callers during a refresh wait for
+it rather than starting their own, so however often the orchestrator polls
+(and however a dependency flaps) each worker probes at most once per window.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.utils import timezone
+from blockchain.indexer import JsonRpcClient
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='health-probe')
+_lock = threading.Lock()
+_report = None
+_checked = 0.0
+_inflight = {}
+
+
+def check_database():
+    connection = connections['default']
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    finally:
+        # Probe threads are long-lived; don't leave a connection parked on each
+        connection.close()
+
+
+def check_cache():
+    key = f'health:{uuid.uuid4().hex}'
+    cache.set(key, 1, 10)
+    try:
+        if cache.get(key) != 1:
+            raise RuntimeError('value written to the cache could not be read back')
+    finally:
+        cache.delete(key)
+
+
+def check_chain():
+    block = JsonRpcClient(settings.CHAIN_RPC_URL, timeout=settings.HEALTH_PROBE_TIMEOUT).call('eth_blockNumber')
+    return {'block': int(block, 16)}
+
+
+def probes():
+    """Probes for this deployment; the chain RPC only matters where receipts are verified"""
+    checks = {'database': check_database, 'cache': check_cache}
+    if getattr(settings, 'HEALTH_CHECK_CHAIN', False):
+        checks['chain'] = check_chain
+    return checks
+
+
+def _timed(probe):
+    started = time.perf_counter()
+    try:
+        result = {'status': 'ok', **(probe() or {})}
+    except Exception as exc:
+        result = {'status': 'error', 'error': str(exc) or exc.__class__.__name__}
+    result['latency_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+def run_probes(timeout=None):
+    timeout = settings.HEALTH_PROBE_TIMEOUT if timeout is None else timeout
+    futures = {}
+    for name, probe in probes().items():
+        # A probe still hung from an earlier window is waited on again rather than stacked up
+        future = _inflight.get(name)
+        if future is None or future.done():
+            future = _inflight[name] = _executor.submit(_timed, probe)
+        futures[name] = future
+    wait(futures.values(), timeout=timeout)
+
+    checks = {}
+    for name, future in futures.items():
+        if future.done():
+            checks[name] = future.result()
+        else:
+            # Left to finish in the background; the thread is not interrupted
+            checks[name] = {'status': 'timeout', 'latency_ms': round(timeout * 1000, 2)}
+    return {
+        'ready': all(check['status'] == 'ok' for check in checks.values()),
+        'checked_at': timezone.now().isoformat(),
+        'checks': checks,
+    }
+
+
+def readiness():
+    """The cached probe report and its age in seconds, probing again once it is HEALTH_CACHE_TTL old"""
+    global _report, _checked
+    with _lock:
+        if _report is None or time.monotonic() - _checked >= settings.HEALTH_CACHE_TTL:
+            _report = run_probes()
+            _checked = time.monotonic()
+        return _report, time.monotonic() - _checked
+
+
+def reset():
+    global _report
+    with _lock:
+        _report = None
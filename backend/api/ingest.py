@@ -0,0 +1,134 @@
+import csv
+import json
+from django.db import IntegrityError, transaction
+from donations.models import Donation, DonationRollup, GlobalStats
+from donations.signals import donation_completed
+from organizations.models import Organization
+from .serializers import DonationImportSerializer
+
+DEFAULT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+
+
+def _decode(lines):
+    for line in lines:
+        yield line.decode('utf-8') if isinstance(line, bytes) else line
+
+
+def iter_ndjson(lines):
+    """Yield (line_number, record, error) for each non-blank NDJSON line"""
+    for number, line in enumerate(_decode(lines), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield number, None, f'Invalid JSON: {exc}'
+            continue
+        if not isinstance(record, dict):
+            yield number, None, 'Expected a JSON object'
+            continue
+        yield number, record, None
+
+
+def iter_csv(lines):
+    """Yield (line_number, record, error) for each CSV row; empty cells are treated as missing"""
+    reader = csv.DictReader(_decode(lines))
+    for row in reader:
+        record = {key: value for key, value in row.items() if key and value not in ('', None)}
+        yield reader.line_num, record, None
+
+
+def iter_records(records):
+    for number, record in enumerate(records, start=1):
+        if not isinstance(record, dict):
+            yield number, None, 'Expected a JSON object'
+            continue
+        yield number, record, None
+
+
+def ingest_donations(rows, batch_size=DEFAULT_BATCH_SIZE, on_batch=None):
+    """
+    Validate and insert donations from (line_number, record, error) rows.
+
+    Rows are processed in batches: each batch is validated, checked against
+    the database with one query per lookup, inserted with bulk_create in its
+    own transaction, and has its completed donations applied to organization
+    and global stats as one delta per organization.
+    """
+    result = {'created': 0, 'failed': 0, 'errors': []}
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            _ingest_batch(batch, result)
+            batch = []
+            if on_batch:
+                on_batch(result)
+    if batch:
+        _ingest_batch(batch, result)
+        if on_batch:
+            on_batch(result)
+    return result
+
+
+def _fail(result, number, errors):
+    result['failed'] += 1
+    if len(result['errors']) < MAX_REPORTED_ERRORS:
+        result['errors'].append({'line': number, 'errors': errors})
+
+
+def _ingest_batch(batch, result):
+    valid = []
+    for number, record, error in batch:
+        if error:
+            _fail(result, number, error)
+            continue
+        serializer = DonationImportSerializer(data=record)
+        if serializer.is_valid():
+            valid.append((number, serializer.validated_data))
+        else:
+            _fail(result, number, serializer.errors)
+
+    org_ids = {data['organization_id'] for _, data in valid}
+    known_orgs = set(Organization.objects.filter(id__in=org_ids).values_list('id', flat=True))
+
+    hashes = {data['transaction_hash'] for _, data in valid if data.get('transaction_hash')}
+    taken_hashes = set(Donation.objects.filter(transaction_hash__in=hashes).values_list('transaction_hash', flat=True))
+
+    donations = []
+    numbers = []
+    for number, data in valid:
+        if data['organization_id'] not in known_orgs:
+            _fail(result, number, {'organization': 'Organization not found'})
+            continue
+        tx_hash = data.get('transaction_hash')
+        if tx_hash:
+            if tx_hash in taken_hashes:
+                _fail(result, number, {'transaction_hash': 'Duplicate transaction hash'})
+                continue
+            taken_hashes.add(tx_hash)
+        donations.append(Donation(**data))
+        numbers.append(number)
+
+    if not donations:
+        return
+
+    completed = [donation for donation in donations if donation.status == 'completed']
+    try:
+        with transaction.atomic():
+            Donation.objects.bulk_create(donations)
+            if completed:
+                touched = Organization.apply_donations(completed)
+                DonationRollup.apply_donations(completed)
+                GlobalStats.apply_donations(completed)
+    except IntegrityError as exc:
+        # A concurrent writer claimed one of the hashes after the check above
+        for number in numbers:
+            _fail(result, number, f'Batch rolled back: {exc}')
+        return
+
+    result['created'] += len(donations)
+    if completed:
+        donation_completed.send(sender=Donation, donation=None, organization_ids=touched, donations=completed)
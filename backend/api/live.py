@@ -0,0 +1,252 @@
+"""
+Live donation events for the Server-Sent Events feed (/api/async/live/).
+
+Completions are published once, after commit, to a broker. Each process
+keeps one Hub that fans a published message out to the asyncio queues of
+its open streams, with a single cross-thread hand-off per event loop, so
+an event costs the same whether ten or ten thousand pages are watching.
+
+The default LocalBroker publishes straight into this process's hub, which
+is enough for a single node. With several nodes set LIVE_BROKER=redis
+(needs the redis package) so every node's hub sees every completion, or
+point LIVE_BROKER at a dotted path to a class with the same interface.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import threading
+from collections import defaultdict
+from decimal import Decimal
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+from donations.models import GlobalStats
+from organizations.models import Organization
+from .payloads import decimal_string, stats_payload
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+DONATIONS_CHANNEL = 'donations'
+STATS_CHANNEL = 'stats'
+# Beyond this many completions in one batch (imports, indexer catch-up) only totals are published
+MAX_DONATION_EVENTS = 100
+
+_event_ids = itertools.count(1)
+
+
+def organization_channel(org_id):
+    return f'organization:{org_id}'
+
+
+def encode(event, data):
+    """One SSE frame, encoded once and shared by every subscriber"""
+    payload = json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return f'id: {next(_event_ids)}\nevent: {event}\ndata: {payload}\n\n'.encode()
+
+
+class Subscription:
+    """A stream's bounded queue on its event loop; None is queued when the client fell too far behind"""
+
+    def __init__(self, hub, channels, maxsize):
+        self.hub = hub
+        self.channels = tuple(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def deliver(self, message):
+        # Runs on self.loop
+        if self.queue.full():
+            # Close the stream; EventSource reconnects and the page refetches
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            self.hub.unsubscribe(self)
+        else:
+            self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+def _deliver_all(subscriptions, message):
+    for subscription in subscriptions:
+        subscription.deliver(message)
+
+
+class Hub:
+    """In-process fan-out from channels to subscriptions"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channels = defaultdict(set)
+
+    def subscribe(self, channels, maxsize=None):
+        subscription = Subscription(self, channels, maxsize or settings.LIVE_QUEUE_SIZE)
+        with self._lock:
+            for channel in subscription.channels:
+                self._channels[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._channels.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._channels[channel]
+
+    def active(self):
+        return bool(self._channels)
+
+    def fanout(self, channel, message):
+        """Thread-safe: hand message to every subscription of channel on its own loop"""
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        by_loop = defaultdict(list)
+        for subscription in subscribers:
+            by_loop[subscription.loop].append(subscription)
+        for loop, group in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_deliver_all, group, message)
+            except RuntimeError:
+                # The loop has shut down; its streams are gone
+                for subscription in group:
+                    self.unsubscribe(subscription)
+
+
+class LocalBroker:
+    """Single-node broker: publishing is an in-process fan-out"""
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    def publish(self, channel, message):
+        self.hub.fanout(channel, message)
+
+    def listening(self):
+        # Nobody to tell, so skip building the events
+        return self.hub.active()
+
+    def start(self):
+        pass
+
+
+class RedisBroker:
+    """
+    Multi-node broker over Redis pub/sub. Every publish goes through Redis,
+    including to local subscribers, and a listener thread (started with the
+    first stream on a node) fans incoming messages into the local hub.
+    """
+
+    def __init__(self, hub, url=None, prefix='live:'):
+        if redis is None:
+            raise ImproperlyConfigured('LIVE_BROKER=redis requires the redis package')
+        self.hub = hub
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url or settings.LIVE_BROKER_URL)
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def publish(self, channel, message):
+        self.client.publish(self.prefix + channel, message)
+
+    def listening(self):
+        # Other nodes may have streams open
+        return True
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen, name='live-broker', daemon=True)
+                self._thread.start()
+
+    def _listen(self):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(self.prefix + '*')
+        for item in pubsub.listen():
+            channel = item['channel'].decode()[len(self.prefix):]
+            self.hub.fanout(channel, item['data'])
+
+
+BROKERS = {'local': LocalBroker, 'redis': RedisBroker}
+
+hub = Hub()
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Process-wide broker configured from LIVE_BROKER"""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            name = settings.LIVE_BROKER
+            broker_class = BROKERS[name] if name in BROKERS else import_string(name)
+            _broker = broker_class(hub)
+    return _broker
+
+
+def subscribe(channels):
+    broker = get_broker()
+    broker.start()
+    return hub.subscribe(channels)
+
+
+def publish_completions(donations, organization_ids):
+    """
+    Publish completed donations, the new totals of their organizations and
+    the platform stats. Called on commit, so a rolled-back completion is
+    never announced; failures are logged rather than raised into the request.
+    """
+    try:
+        broker = get_broker()
+        if not broker.listening():
+            return
+        raised = defaultdict(Decimal)
+        counts = defaultdict(int)
+        for donation in donations:
+            raised[donation.organization_id] += donation.amount
+            counts[donation.organization_id] += 1
+
+        if len(donations) <= MAX_DONATION_EVENTS:
+            for donation in donations:
+                message = encode('donation', {
+                    'id': donation.pk,
+                    'organization': donation.organization_id,
+                    'donor_wallet': donation.donor_wallet,
+                    'amount': donation.amount,
+                    'amount_usd': donation.amount_usd,
+                    'transaction_hash': donation.transaction_hash,
+                    'completed_at': donation.completed_at,
+                })
+                broker.publish(DONATIONS_CHANNEL, message)
+                broker.publish(organization_channel(donation.organization_id), message)
+
+        # Absolute totals alongside the delta, so a client that missed an event can't drift
+        for org_id, raised_amount, donor_count in Organization.objects.filter(
+            id__in=organization_ids
+        ).values_list('id', 'raised_amount', 'donor_count'):
+            message = encode('organization', {
+                'id': org_id,
+                'raised': decimal_string(raised_amount, 2),
+                'donors': donor_count,
+                'raised_delta': decimal_string(raised[org_id], 2),
+                'donations_delta': counts[org_id],
+            })
+            broker.publish(DONATIONS_CHANNEL, message)
+            broker.publish(organization_channel(org_id), message)
+
+        broker.publish(STATS_CHANNEL, encode('stats', stats_payload(GlobalStats.load())))
+    except Exception:
+        logger.exception('Could not publish live donation events')
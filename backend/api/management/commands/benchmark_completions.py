@@ -0,0 +1,137 @@
+import json
+import queue
+import threading
+import time
+import uuid
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections
+from api.db import describe_connection
+from api.management.utils import percentile
+from donations.models import Donation, GlobalDonor, GlobalStats
+from organizations.models import Organization
+
+
+class Command(BaseCommand):
+    help = (
+        'Complete donations from concurrent threads against the configured database and report '
+        'write throughput. Run it once per profile (e.g. DB_SQLITE_JOURNAL_MODE=DELETE, the WAL '
+        'default, DB_ENGINE=postgres) to compare them. Benchmark rows are removed afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--donations', type=int, default=2000)
+        parser.add_argument('--threads', type=int, nargs='*', default=[1, 4, 16])
+        parser.add_argument('--donors', type=int, default=500, help='Distinct wallets across the donations')
+        parser.add_argument('--batch', type=int, default=0, help='Use complete_batch with this many items per call')
+        parser.add_argument('--output', help='Also write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        profile = describe_connection(connection)
+        self.stdout.write('profile: ' + ', '.join(f'{key}={value}' for key, value in profile.items()))
+        self.stdout.write(f'{"threads":>8}{"done/s":>10}{"p50 ms":>10}{"p99 ms":>10}{"errors":>8}')
+
+        results = []
+        for threads in options['threads']:
+            org = self.create_org()
+            try:
+                ids = self.create_donations(org, options['donations'], options['donors'])
+                result = self.run(ids, threads, options['batch'])
+            finally:
+                self.cleanup(org)
+            results.append(result)
+            self.stdout.write(
+                f'{threads:>8}{result["per_second"]:>10.0f}{result["p50_ms"]:>10.2f}'
+                f'{result["p99_ms"]:>10.2f}{result["errors"]:>8}'
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({'profile': profile, 'batch': options['batch'], 'results': results}, fh, indent=2, default=str)
+
+    def create_org(self):
+        tag = uuid.uuid4().hex
+        return Organization.objects.create(
+            name=f'Benchmark {tag[:8]}',
+            category='other',
+            location='benchmark',
+            description='Temporary organization created by benchmark_completions',
+            wallet_address='0x' + tag + tag[:8],
+        )
+
+    def create_donations(self, org, count, donors):
+        donations = Donation.objects.bulk_create([
+            Donation(
+                organization=org,
+                donor_wallet='0x%040x' % (org.id * 10 ** 9 + index % donors),
+                amount=Decimal('1.5'),
+                amount_usd=Decimal('1.50'),
+            )
+            for index in range(count)
+        ])
+        if donations and donations[0].pk is not None:
+            return [donation.pk for donation in donations]
+        return list(Donation.objects.filter(organization=org).values_list('id', flat=True))
+
+    def run(self, ids, threads, batch):
+        work = queue.Queue()
+        size = max(batch, 1)
+        for index in range(0, len(ids), size):
+            work.put(ids[index:index + size])
+
+        latencies = []
+        errors = []
+        done = [0]
+        lock = threading.Lock()
+
+        def worker():
+            try:
+                while True:
+                    try:
+                        chunk = work.get_nowait()
+                    except queue.Empty:
+                        return
+                    started = time.perf_counter()
+                    try:
+                        if batch:
+                            Donation.complete_batch([(pk, '0x%064x' % pk) for pk in chunk])
+                        else:
+                            donation = Donation.objects.select_related('organization').get(pk=chunk[0])
+                            donation.complete('0x%064x' % chunk[0])
+                    except OperationalError as exc:
+                        with lock:
+                            errors.append(str(exc))
+                        continue
+                    with lock:
+                        latencies.append(time.perf_counter() - started)
+                        done[0] += len(chunk)
+            finally:
+                connections.close_all()
+
+        started = time.perf_counter()
+        pool = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'threads': threads,
+            'completed': done[0],
+            'seconds': elapsed,
+            'per_second': done[0] / elapsed if elapsed else 0.0,
+            'p50_ms': percentile(latencies, 0.5) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+            'errors': len(errors),
+            'first_error': errors[0] if errors else None,
+        }
+
+    def cleanup(self, org):
+        wallets = set(Donation.objects.filter(organization=org).values_list('donor_wallet', flat=True))
+        org.delete()
+        GlobalDonor.objects.filter(donor_wallet__in=wallets).exclude(
+            donor_wallet__in=Donation.objects.filter(status='completed').values('donor_wallet')
+        ).delete()
+        GlobalStats.rebuild()
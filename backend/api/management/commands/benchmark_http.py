@@ -0,0 +1,88 @@
+import asyncio
+import json
+import time
+from django.core.management.base import BaseCommand, CommandError
+from api.management.utils import percentile
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp ships with web3
+    aiohttp = None
+
+DEFAULT_PATHS = ['organizations/', 'organizations/{org_id}/', 'donations/', 'stats/', 'health/']
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test API routes on a running server at fixed concurrency and report p50/p99 latency and '
+        'requests/second. Run it once against the WSGI server (gunicorn config.wsgi) and once against '
+        'uvicorn (config.asgi) with --prefix api/async/ to compare the two paths.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('base_url', help='e.g. http://127.0.0.1:8000/')
+        parser.add_argument('--prefix', default='api/', help="Route prefix: 'api/' (DRF) or 'api/async/' (async views)")
+        parser.add_argument('--paths', nargs='*', default=DEFAULT_PATHS)
+        parser.add_argument('--org-id', type=int, default=1)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per path')
+        parser.add_argument('--output', help='Also write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        if aiohttp is None:
+            raise CommandError('benchmark_http requires aiohttp (installed with web3)')
+
+        results = asyncio.run(self.run(options))
+
+        self.stdout.write(f'{"path":<32}{"p50 ms":>10}{"p99 ms":>10}{"req/s":>10}{"errors":>8}')
+        for result in results:
+            self.stdout.write(
+                f'{result["path"]:<32}{result["p50_ms"]:>10.2f}{result["p99_ms"]:>10.2f}'
+                f'{result["rps"]:>10.0f}{result["errors"]:>8}'
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({'options': {k: options[k] for k in ('base_url', 'prefix', 'concurrency', 'requests')},
+                           'results': results}, fh, indent=2)
+
+    async def run(self, options):
+        base = options['base_url'].rstrip('/') + '/' + options['prefix'].strip('/') + '/'
+        connector = aiohttp.TCPConnector(limit=options['concurrency'])
+        async with aiohttp.ClientSession(connector=connector) as session:
+            results = []
+            for path in options['paths']:
+                url = base + path.format(org_id=options['org_id'])
+                results.append(await self.load(session, url, path, options['concurrency'], options['requests']))
+            return results
+
+    async def load(self, session, url, path, concurrency, total):
+        latencies = []
+        errors = 0
+        remaining = iter(range(total))
+
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                start = time.perf_counter()
+                try:
+                    async with session.get(url) as response:
+                        await response.read()
+                        if response.status >= 400:
+                            errors += 1
+                except aiohttp.ClientError:
+                    errors += 1
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'path': path,
+            'p50_ms': percentile(latencies, 0.50),
+            'p99_ms': percentile(latencies, 0.99),
+            'rps': total / elapsed if elapsed else 0.0,
+            'errors': errors,
+        }
@@ -0,0 +1,115 @@
+import json
+import random
+import time
+import uuid
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import connection
+from api.db import describe_connection
+from blockchain.indexer import JsonRpcClient, TransferIndexer
+from blockchain.models import IndexerCheckpoint
+from blockchain.standin import StandInNode
+from donations.models import Donation, GlobalDonor, GlobalStats
+from organizations.models import Organization
+
+TOKEN = '0x' + 'c' * 40
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the Transfer indexer against a local stand-in node holding synthetic logs and report '
+        'blocks per second. Benchmark organizations, donations and the checkpoint are removed afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--blocks', type=int, default=50000)
+        parser.add_argument('--transfers', type=int, default=5000, help='Matching Transfer logs spread over the blocks')
+        parser.add_argument('--orgs', type=int, default=20)
+        parser.add_argument('--max-logs', type=int, default=10000, help="The node's too-many-results limit")
+        parser.add_argument('--latency', type=float, default=0.0, help='Seconds the node waits before each reply')
+        parser.add_argument('--initial-span', type=int, default=500)
+        parser.add_argument('--max-span', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=12)
+        parser.add_argument('--output', help='Also write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        tag = uuid.uuid4().hex
+        node = StandInNode(TOKEN)
+        node.max_logs = options['max_logs']
+        node.delay = options['latency']
+        reorg_depth = 12
+        node.head = options['blocks'] + reorg_depth
+
+        orgs = self.create_orgs(tag, options['orgs'])
+        name = f'benchmark-{tag[:8]}'
+        try:
+            self.create_transfers(node, rng, orgs, options['transfers'], options['blocks'])
+            indexer = TransferIndexer(
+                JsonRpcClient(node.url), TOKEN, reorg_depth=reorg_depth,
+                initial_span=options['initial_span'], max_span=options['max_span'], name=name,
+            )
+            started = time.perf_counter()
+            blocks = indexer.run_once(start_block=1)
+            elapsed = time.perf_counter() - started
+        finally:
+            node.close()
+            self.cleanup(orgs, name)
+
+        result = {
+            'blocks': blocks,
+            'logs': indexer.stats['logs'],
+            'completed': indexer.stats['completed'],
+            'rpc_requests': node.requests,
+            'final_span': indexer.span,
+            'seconds': elapsed,
+            'blocks_per_second': blocks / elapsed if elapsed else 0.0,
+            'logs_per_second': indexer.stats['logs'] / elapsed if elapsed else 0.0,
+        }
+        self.stdout.write(
+            f"{result['blocks']} blocks, {result['logs']} logs, {result['completed']} completed in "
+            f"{elapsed:.2f}s over {result['rpc_requests']} RPC requests: "
+            f"{result['blocks_per_second']:.0f} blocks/s, {result['logs_per_second']:.0f} logs/s"
+        )
+
+        if options['output']:
+            profile = describe_connection(connection)
+            options_used = {key: options[key] for key in ('blocks', 'transfers', 'orgs', 'max_logs', 'latency')}
+            with open(options['output'], 'w') as fh:
+                json.dump({'profile': profile, 'options': options_used, 'result': result}, fh, indent=2, default=str)
+
+    def create_orgs(self, tag, count):
+        return [
+            Organization.objects.create(
+                name=f'Benchmark {tag[:8]} {index}',
+                category='other',
+                location='benchmark',
+                description='Temporary organization created by benchmark_indexer',
+                wallet_address='0x%s%08x' % (tag, index),
+            )
+            for index in range(count)
+        ]
+
+    def create_transfers(self, node, rng, orgs, count, blocks):
+        """One pending donation per transfer, from one of a few hundred wallets"""
+        donations = []
+        for index in range(count):
+            org = orgs[index % len(orgs)]
+            donor = '0x%040x' % (org.id * 10 ** 6 + rng.randrange(300))
+            cents = rng.randrange(1, 10000)
+            donations.append(Donation(organization=org, donor_wallet=donor, amount=Decimal(cents) / 100))
+            node.add_transfer('0x%064x' % (10 ** 12 + index), donor, org.wallet_address, cents * 10 ** 16,
+                              block=rng.randrange(1, blocks + 1))
+        Donation.objects.bulk_create(donations, batch_size=1000)
+
+    def cleanup(self, orgs, name):
+        IndexerCheckpoint.objects.filter(name=name).delete()
+        org_ids = [org.id for org in orgs]
+        wallets = Donation.objects.filter(organization_id__in=org_ids).values('donor_wallet')
+        GlobalDonor.objects.filter(donor_wallet__in=wallets).exclude(
+            donor_wallet__in=Donation.objects.filter(status='completed').exclude(
+                organization_id__in=org_ids
+            ).values('donor_wallet')
+        ).delete()
+        Organization.objects.filter(id__in=org_ids).delete()
+        GlobalStats.rebuild()
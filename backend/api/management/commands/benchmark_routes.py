@@ -0,0 +1,298 @@
+import json
+import logging
+import subprocess
+import time
+import uuid
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from api import urls as api_urls
+from api.db import describe_connection
+from api.management.utils import percentile
+from api.pagination import StandardPagination
+from donations.models import Donation, DonationRollup
+from organizations.models import Organization, OrganizationUpdate
+
+
+# Routes a request/response benchmark can't drive, and why
+UNBENCHMARKED = {
+    'async-live': 'never-ending event stream',
+}
+
+
+# Routes that need a staff user, driven through a client authenticated as one
+STAFF_ONLY = {'donation-bulk'}
+
+
+class Rollback(Exception):
+    """Raised to undo a write scenario after it has been timed"""
+
+
+def route_names(patterns=None):
+    """Every named route in api.urls, including the router's"""
+    names = set()
+    for pattern in api_urls.urlpatterns if patterns is None else patterns:
+        if hasattr(pattern, 'url_patterns'):
+            names |= route_names(pattern.url_patterns)
+        elif pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+def scenarios(f):
+    """(name, route, method, url kwargs, query params or request body) for every route, against fixtures f"""
+    org, typical, donation = f['org'], f['typical'], f['donation']
+    wallet = donation.donor_wallet
+    pending = f['pending']
+    fresh_hash = lambda: '0x' + uuid.uuid4().hex + uuid.uuid4().hex
+
+    reads = [
+        ('api-root', 'api-root', {}, {}),
+        ('organization-list', 'organization-list', {}, {}),
+        ('organization-list?category', 'organization-list', {}, {'category': org.category, 'verified': 'true'}),
+        ('organization-list?search', 'organization-list', {}, {'search': org.name.split()[0]}),
+        ('organization-list?page=last', 'organization-list', {}, {'page': f['last_page']}),
+        ('organization-list?cursor', 'organization-list', {}, {'pagination': 'cursor'}),
+        ('organization-detail', 'organization-detail', {'pk': org.pk}, {}),
+        ('organization-detail?updates=none', 'organization-detail', {'pk': org.pk}, {'updates': 'none', 'dates': 'client'}),
+        ('organization-updates', 'organization-updates', {'pk': org.pk}, {}),
+        ('organization-timeseries', 'organization-timeseries', {'pk': org.pk}, {}),
+        ('organization-timeseries?hour', 'organization-timeseries', {'pk': org.pk}, {'granularity': 'hour'}),
+        ('organization-timeseries?exact', 'organization-timeseries', {'pk': org.pk}, {'exact': 'true'}),
+        ('organization-category-timeseries', 'organization-category-timeseries', {}, {'category': org.category}),
+        ('organization-category-timeseries?hour', 'organization-category-timeseries', {}, {
+            'category': org.category, 'granularity': 'hour'
+        }),
+        ('donation-list', 'donation-list', {}, {}),
+        ('donation-list?organization', 'donation-list', {}, {'organization': org.pk, 'status': 'completed'}),
+        ('donation-list?donor_wallet', 'donation-list', {}, {'donor_wallet': wallet}),
+        ('donation-list?cursor', 'donation-list', {}, {'organization': org.pk, 'pagination': 'cursor'}),
+        ('donation-detail', 'donation-detail', {'pk': donation.pk}, {}),
+        ('donation-export', 'donation-export', {}, {'organization': typical.pk}),
+        ('donation-export?ndjson', 'donation-export', {}, {'organization': typical.pk, 'output': 'ndjson'}),
+        ('donation-stats', 'donation-stats', {}, {}),
+        ('donation-stats?category', 'donation-stats', {}, {'category': org.category}),
+        ('health-check', 'health-check', {}, {}),
+        ('health-live', 'health-live', {}, {}),
+        ('health-ready', 'health-ready', {}, {}),
+        ('metrics', 'metrics', {}, {}),
+        ('async-organization-list', 'async-organization-list', {}, {}),
+        ('async-organization-detail', 'async-organization-detail', {'pk': org.pk}, {}),
+        ('async-donation-list', 'async-donation-list', {}, {'organization': org.pk}),
+        ('async-donation-stats', 'async-donation-stats', {}, {}),
+        ('async-health-check', 'async-health-check', {}, {}),
+    ]
+    result = [
+        {'name': name, 'route': route, 'method': 'GET', 'kwargs': kwargs, 'params': params}
+        for name, route, kwargs, params in reads
+    ]
+
+    addresses = [wallet] * 100
+    writes = [
+        ('validate-wallet', 'validate-wallet', lambda: {'address': wallet}),
+        ('validate-wallets', 'validate-wallets', lambda: {'addresses': addresses, 'checksum': True}),
+        ('validate-transaction', 'validate-transaction', lambda: {'transaction_hash': fresh_hash()}),
+        ('validate-transactions', 'validate-transactions', lambda: {'transaction_hashes': [fresh_hash() for _ in range(100)]}),
+        ('donation-create', 'donation-list', lambda: {
+            'organization': typical.pk, 'donor_wallet': wallet, 'amount': '1.5', 'amount_usd': '1.50'
+        }),
+        ('donation-bulk', 'donation-bulk', lambda: [
+            {
+                'organization': typical.pk, 'donor_wallet': wallet, 'amount': '2.5', 'amount_usd': '2.50',
+                'status': 'completed', 'transaction_hash': fresh_hash()
+            }
+            for _ in range(50)
+        ]),
+        ('donation-complete', 'donation-complete', lambda: {
+            'donation_id': pending[0], 'transaction_hash': fresh_hash()
+        }),
+        ('donation-complete-batch', 'donation-complete-batch', lambda: {
+            'items': [{'donation_id': pk, 'transaction_hash': fresh_hash()} for pk in pending[1:]]
+        }),
+    ]
+    result += [
+        {
+            'name': name, 'route': route, 'method': 'POST', 'kwargs': {}, 'body': body,
+            'write': route.startswith('donation'), 'staff': route in STAFF_ONLY,
+        }
+        for name, route, body in writes
+    ]
+    return result
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive every route in api/urls.py in-process and record latency percentiles and query '
+        'counts, optionally as JSON for comparison against a baseline from another commit. '
+        'Writes run inside a transaction that is rolled back. Load data with generate_dataset first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=30, help='Timed requests per scenario')
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--cold-cache', action='store_true', help='Clear the response cache before every request')
+        parser.add_argument('--only', nargs='*', help='Run only scenarios whose name starts with one of these')
+        parser.add_argument('--output', help='Write results as JSON to this file')
+        parser.add_argument('--compare', help='Baseline JSON from an earlier run to compare against')
+        parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed p50 slowdown before flagging, as a fraction')
+
+    def handle(self, *args, **options):
+        fixtures = self.fixtures()
+        selected = scenarios(fixtures)
+        missing = route_names() - {scenario['route'] for scenario in selected} - set(UNBENCHMARKED)
+        if missing:
+            raise CommandError(
+                f'No scenario for: {", ".join(sorted(missing))}; add one to scenarios() or list it in UNBENCHMARKED'
+            )
+        if options['only']:
+            selected = [s for s in selected if s['name'].startswith(tuple(options['only']))]
+
+        # Query counts are in the report; the middleware's per-request threshold warnings would drown it
+        logging.getLogger('api.metrics').setLevel(logging.ERROR)
+        host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'
+        client = Client(HTTP_HOST=host)
+        staff_client = APIClient(HTTP_HOST=host)
+        # Never saved: force_authenticate skips the session, so no user row is needed
+        staff_client.force_authenticate(User(username='benchmark', is_staff=True))
+        self.stdout.write(f'{"scenario":<36}{"status":>7}{"p50 ms":>9}{"p90 ms":>9}{"p99 ms":>9}{"queries":>9}')
+
+        results = {}
+        for scenario in selected:
+            result = self.run(staff_client if scenario.get('staff') else client, scenario, options['warmup'], options['repeat'], options['cold_cache'])
+            results[scenario['name']] = result
+            self.stdout.write(
+                f'{scenario["name"]:<36}{result["status"]:>7}{result["p50_ms"]:>9.2f}{result["p90_ms"]:>9.2f}'
+                f'{result["p99_ms"]:>9.2f}{result["queries"]:>9}'
+            )
+
+        report = {
+            'commit': self.commit(),
+            'timestamp': timezone.now().isoformat(),
+            'database': describe_connection(connection),
+            'dataset': {
+                'organizations': Organization.objects.count(),
+                'updates': OrganizationUpdate.objects.count(),
+                'donations': Donation.objects.count(),
+                'rollups': DonationRollup.objects.count(),
+            },
+            'options': {key: options[key] for key in ('repeat', 'warmup', 'cold_cache')},
+            'routes': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2, default=str)
+
+        if options['compare']:
+            self.compare(report, options['compare'], options['tolerance'])
+
+    def fixtures(self):
+        org = Organization.objects.defer('donor_sketch').order_by('-donor_count', 'id').first()
+        if org is None:
+            raise CommandError('No organizations to benchmark; run generate_dataset first')
+        orgs = Organization.objects.count()
+        typical = Organization.objects.defer('donor_sketch').order_by('donor_count', 'id')[orgs // 2]
+        donation = Donation.objects.filter(organization=org).order_by('-created_at').first()
+        if donation is None:
+            raise CommandError(f'Organization {org.pk} has no donations; run generate_dataset first')
+        pending = list(Donation.objects.filter(status='pending').order_by('id').values_list('id', flat=True)[:21])
+        if len(pending) < 21:
+            raise CommandError('The completion scenarios need 21 pending donations; run generate_dataset first')
+        last_page = max(1, -(-orgs // StandardPagination.page_size))
+        return {'org': org, 'typical': typical, 'donation': donation, 'pending': pending, 'last_page': last_page}
+
+    def request(self, client, scenario):
+        path = reverse(scenario['route'], kwargs=scenario['kwargs'] or None)
+        if scenario['method'] == 'GET':
+            response = client.get(path, scenario['params'])
+        else:
+            response = client.post(path, json.dumps(scenario['body']()), content_type='application/json')
+        # Streaming bodies are produced while they're consumed, so that's part of the request
+        size = sum(len(chunk) for chunk in response.streaming_content) if response.streaming else len(response.content)
+        return response.status_code, size
+
+    def timed(self, client, scenario, cold_cache):
+        if cold_cache:
+            cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            if scenario.get('write'):
+                try:
+                    with transaction.atomic():
+                        status, size = self.request(client, scenario)
+                        elapsed = time.perf_counter() - started
+                        raise Rollback
+                except Rollback:
+                    pass
+            else:
+                status, size = self.request(client, scenario)
+                elapsed = time.perf_counter() - started
+        return elapsed, len(queries), status, size
+
+    def run(self, client, scenario, warmup, repeat, cold_cache):
+        for _ in range(warmup):
+            self.timed(client, scenario, cold_cache)
+
+        timings, query_counts, statuses = [], [], set()
+        size = 0
+        for _ in range(repeat):
+            elapsed, queries, status, size = self.timed(client, scenario, cold_cache)
+            timings.append(elapsed)
+            query_counts.append(queries)
+            statuses.add(status)
+
+        timings.sort()
+        return {
+            'route': scenario['route'],
+            'method': scenario['method'],
+            'status': ','.join(str(status) for status in sorted(statuses)),
+            'p50_ms': percentile(timings, 0.5) * 1000,
+            'p90_ms': percentile(timings, 0.9) * 1000,
+            'p99_ms': percentile(timings, 0.99) * 1000,
+            'mean_ms': sum(timings) / len(timings) * 1000 if timings else 0.0,
+            'queries': max(query_counts, default=0),
+            'bytes': size,
+        }
+
+    def commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True, cwd=settings.BASE_DIR
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def compare(self, report, path, tolerance):
+        with open(path) as fh:
+            baseline = json.load(fh)
+
+        self.stdout.write(f'\nAgainst {path} (commit {baseline.get("commit")}):')
+        if baseline.get('dataset') != report['dataset']:
+            self.stderr.write(self.style.WARNING('Datasets differ, so timings are not directly comparable'))
+
+        regressions = []
+        for name, current in report['routes'].items():
+            before = baseline['routes'].get(name)
+            if before is None:
+                continue
+            ratio = current['p50_ms'] / before['p50_ms'] if before['p50_ms'] else 1.0
+            notes = []
+            if ratio > 1 + tolerance:
+                notes.append(f'p50 {before["p50_ms"]:.2f} -> {current["p50_ms"]:.2f} ms')
+            if current['queries'] > before['queries']:
+                notes.append(f'queries {before["queries"]} -> {current["queries"]}')
+            if current['status'] != before['status']:
+                notes.append(f'status {before["status"]} -> {current["status"]}')
+            if notes:
+                regressions.append(f'{name}: {", ".join(notes)}')
+            self.stdout.write(f'{name:<36}{ratio:>8.2f}x{"  " + "; ".join(notes) if notes else ""}')
+
+        if regressions:
+            raise CommandError(f'{len(regressions)} regressions:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('No regressions'))
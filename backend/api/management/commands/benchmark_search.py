@@ -0,0 +1,93 @@
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from organizations.models import Organization
+from organizations.search import get_backend, search_organizations
+
+WORDS = [
+    'water', 'clean', 'school', 'teacher', 'clinic', 'medical', 'forest', 'climate', 'flood',
+    'relief', 'village', 'rural', 'children', 'women', 'rights', 'housing', 'food', 'farm',
+    'solar', 'wells', 'training', 'community', 'hospital', 'refugee', 'ocean', 'wildlife',
+]
+LOCATIONS = ['Kenya', 'India', 'Brazil', 'Peru', 'Nepal', 'Ghana', 'Haiti', 'Vietnam', 'Multiple']
+QUERIES = ['water', 'clean water', 'school teacher', 'medical clinic', 'refugee housing', 'solar', 'kenya', 'wildl']
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare full-text organization search against the icontains scan on a synthetic dataset'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orgs', type=int, default=100000, help='Synthetic organizations to create')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query')
+
+    def handle(self, *args, **options):
+        # Everything happens inside a transaction that is rolled back, leaving the database untouched
+        try:
+            with transaction.atomic():
+                self.populate(options['orgs'])
+                self.run(options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def populate(self, count):
+        self.stdout.write(f'Creating {count} synthetic organizations...')
+        rng = random.Random(42)
+        
+        # Zipf-like vocabulary of filler words with the domain words spread through its ranks
+        vocabulary = [''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=rng.randint(4, 9))) for _ in range(5000)]
+        for index, word in enumerate(WORDS):
+            vocabulary.insert(20 + index * 150, word)
+        weights = [1 / (rank + 10) for rank in range(len(vocabulary))]
+        
+        def text(k):
+            return ' '.join(rng.choices(vocabulary, weights=weights, k=k))
+        
+        batch = []
+        for i in range(count):
+            batch.append(Organization(
+                name=text(3).title(),
+                category='other',
+                location=rng.choice(LOCATIONS),
+                description=text(12),
+                long_description=text(60),
+                wallet_address=f'0xbench{i:035x}',
+            ))
+            if len(batch) == 5000:
+                Organization.objects.bulk_create(batch)
+                batch = []
+        Organization.objects.bulk_create(batch)
+        
+        backend = get_backend()
+        if backend:
+            backend.rebuild()
+
+    def run(self, repeat):
+        # Each timed run mirrors a list request: a COUNT for the paginator, then the first page
+        paths = {
+            'icontains': lambda term: Organization.objects.filter(
+                Q(name__icontains=term) | Q(description__icontains=term)
+            ),
+            'full-text': lambda term: search_organizations(Organization.objects.all(), term),
+        }
+        
+        self.stdout.write(f'{"query":<18}{"path":<12}{"p50 ms":>10}{"p95 ms":>10}')
+        for term in QUERIES:
+            for name, build in paths.items():
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    queryset = build(term)
+                    queryset.count()
+                    list(queryset[:20])
+                    timings.append((time.perf_counter() - start) * 1000)
+                timings.sort()
+                p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                self.stdout.write(f'{term:<18}{name:<12}{statistics.median(timings):>10.2f}{p95:>10.2f}')
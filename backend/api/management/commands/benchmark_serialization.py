@@ -0,0 +1,75 @@
+import timeit
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from organizations.models import Organization
+from donations.models import Donation
+from api.renderers import ORJSONRenderer, orjson
+from api.serializers import DonationRows, DonationSerializer, OrganizationListRows, OrganizationListSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare serializer + renderer paths for a page of organizations and donations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100, help='Rows per page')
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed; ORJSONRenderer falls back to the stdlib'))
+
+        # Synthetic rows live inside a transaction that is rolled back
+        try:
+            with transaction.atomic():
+                self.populate(options['rows'])
+                self.run(options['rows'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def populate(self, rows):
+        orgs = Organization.objects.bulk_create([
+            Organization(
+                name=f'Benchmark Org {i}', category='other', location='Multiple',
+                description='Synthetic organization for serialization benchmarks',
+                wallet_address=f'0xbench{i:035x}', raised_amount=Decimal('12345.67'), goal_amount=Decimal('50000'),
+            )
+            for i in range(rows)
+        ])
+        Donation.objects.bulk_create([
+            Donation(
+                organization=orgs[i % len(orgs)], donor_wallet=f'0x{i:040x}',
+                amount=Decimal('12.345678901234567890'), amount_usd=Decimal('12.35'),
+                transaction_hash=f'0x{i:064x}', status='completed',
+            )
+            for i in range(rows)
+        ])
+
+    def run(self, rows, repeat):
+        orgs = Organization.objects.filter(wallet_address__startswith='0xbench')[:rows]
+        donations = Donation.objects.select_related('organization').filter(
+            organization__wallet_address__startswith='0xbench'
+        )[:rows]
+        stock, fast = JSONRenderer(), ORJSONRenderer()
+
+        cases = [
+            ('organizations: serializer + json', lambda: stock.render(OrganizationListSerializer(orgs.all(), many=True).data)),
+            ('organizations: serializer + orjson', lambda: fast.render(OrganizationListSerializer(orgs.all(), many=True).data)),
+            ('organizations: values rows + orjson', lambda: fast.render(
+                OrganizationListRows.serialize(orgs.all().values(*OrganizationListRows.values)))),
+            ('donations: serializer + json', lambda: stock.render(DonationSerializer(donations.all(), many=True).data)),
+            ('donations: serializer + orjson', lambda: fast.render(DonationSerializer(donations.all(), many=True).data)),
+            ('donations: values rows + orjson', lambda: fast.render(
+                DonationRows.serialize(donations.all().values(*DonationRows.values)))),
+        ]
+
+        self.stdout.write(f'{rows} rows per page, best of {repeat} (query + serialize + render)')
+        for name, run in cases:
+            best = min(timeit.repeat(run, number=1, repeat=repeat))
+            self.stdout.write(f'{name:<40}{best * 1000:>10.2f} ms')
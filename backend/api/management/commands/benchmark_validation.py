@@ -0,0 +1,71 @@
+import random
+import timeit
+from django.core.management.base import BaseCommand
+from blockchain.web3_client import blockchain_utils
+
+
+def legacy_validate_eth_address(address):
+    if not address:
+        return False
+    addr = address.lower().replace('0x', '')
+    if len(addr) != 40:
+        return False
+    try:
+        int(addr, 16)
+        return True
+    except ValueError:
+        return False
+
+
+def legacy_validate_tx_hash(tx_hash):
+    if not tx_hash:
+        return False
+    hash_str = tx_hash.lower().replace('0x', '')
+    if len(hash_str) != 64:
+        return False
+    try:
+        int(hash_str, 16)
+        return True
+    except ValueError:
+        return False
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark the per-value and batch address/hash validation paths'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=10000, help='Values per batch')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        rng = random.Random(7)
+        size = options['size']
+
+        def sample(length):
+            values = []
+            for _ in range(size):
+                value = '0x' + ''.join(rng.choices('0123456789abcdefABCDEF', k=length))
+                roll = rng.random()
+                if roll < 0.1:
+                    value = value[:-1] + 'g'
+                elif roll < 0.2:
+                    value = value[:-3]
+                values.append(value)
+            return values
+
+        addresses = sample(40)
+        hashes = sample(64)
+
+        cases = [
+            ('address legacy', lambda: [legacy_validate_eth_address(a) for a in addresses]),
+            ('address per-value', lambda: [blockchain_utils.validate_eth_address(a) for a in addresses]),
+            ('address batch', lambda: blockchain_utils.validate_eth_addresses(addresses)),
+            ('tx hash legacy', lambda: [legacy_validate_tx_hash(h) for h in hashes]),
+            ('tx hash per-value', lambda: [blockchain_utils.validate_tx_hash(h) for h in hashes]),
+            ('tx hash batch', lambda: blockchain_utils.validate_tx_hashes(hashes)),
+        ]
+
+        self.stdout.write(f'{size} values per call, best of {options["repeat"]}')
+        for name, run in cases:
+            best = min(timeit.repeat(run, number=1, repeat=options['repeat']))
+            self.stdout.write(f'{name:<20}{best * 1000:>10.2f} ms{size / best / 1e6:>10.2f} M/s')
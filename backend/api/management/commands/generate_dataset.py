@@ -0,0 +1,224 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from blockchain.web3_client import blockchain_utils
+from donations.hll import HyperLogLog
+from donations.models import Donation, DonationRollup, GlobalDonor, GlobalStats
+from organizations.models import Organization, OrganizationDonor, OrganizationImpact, OrganizationUpdate
+from organizations.search import get_backend
+
+WORDS = [
+    'water', 'clean', 'school', 'teacher', 'clinic', 'medical', 'forest', 'climate', 'flood',
+    'relief', 'village', 'rural', 'children', 'women', 'rights', 'housing', 'food', 'farm',
+    'solar', 'wells', 'training', 'community', 'hospital', 'refugee', 'ocean', 'wildlife',
+    'access', 'support', 'families', 'local', 'health', 'safe', 'future', 'hope', 'build',
+]
+LOCATIONS = ['Kenya', 'India', 'Brazil', 'Peru', 'Nepal', 'Ghana', 'Haiti', 'Vietnam', 'Uganda', 'Multiple']
+EMOJIS = {
+    'water': '💧', 'education': '📚', 'healthcare': '🏥', 'environment': '🌳',
+    'poverty': '🏠', 'disaster': '🆘', 'human_rights': '⚖️', 'other': '🌍',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a large synthetic dataset with bulk_create: organizations with impacts and updates, '
+        'and donations whose counts per organization and per donor follow a power law. Derived tables '
+        '(donor sets, stats, rollups, search index) are rebuilt at the end.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orgs', type=int, default=1000)
+        parser.add_argument('--donations', type=int, default=100000)
+        parser.add_argument('--donors', type=int, default=0, help='Distinct donor wallets (default: donations / 10)')
+        parser.add_argument('--impacts', type=int, default=4, help='Impacts per organization')
+        parser.add_argument('--updates', type=int, default=5, help='Updates per organization')
+        parser.add_argument('--days', type=int, default=365, help='History length')
+        parser.add_argument('--skew', type=float, default=1.1, help='Zipf exponent for donations per organization')
+        parser.add_argument('--completed', type=float, default=0.85, help='Share of completed donations')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--reset', action='store_true', help='Delete all organizations and donations first')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        self.span = timedelta(days=options['days']).total_seconds()
+        # Distinguishes this run's wallets and hashes from existing rows when appending
+        self.tag = self.rng.getrandbits(32)
+        self.wallets = {}
+        started = time.perf_counter()
+
+        if options['reset']:
+            self.phase('Deleting existing data', self.reset)
+        elif Organization.objects.filter(wallet_address__startswith=f'0x{self.tag:08x}').exists():
+            raise CommandError(f'A dataset with seed {options["seed"]} already exists; use --reset or another --seed')
+
+        org_ids = self.phase('Creating organizations', self.create_orgs, options['orgs'])
+        self.phase('Creating impacts and updates', self.create_children, org_ids, options['impacts'], options['updates'])
+        self.phase(
+            'Creating donations', self.create_donations, org_ids, options['donations'],
+            options['donors'] or max(1, options['donations'] // 10), options['skew'], options['completed']
+        )
+        self.phase('Rebuilding global stats', GlobalStats.rebuild)
+        self.phase('Rebuilding rollups', DonationRollup.rebuild, batch_size=self.batch_size)
+        backend = get_backend()
+        if backend is not None:
+            self.phase('Rebuilding search index', backend.rebuild)
+
+        self.stdout.write(self.style.SUCCESS(f'Done in {time.perf_counter() - started:.1f}s'))
+
+    def phase(self, label, func, *args, **kwargs):
+        self.stdout.write(f'{label}...')
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.stdout.write(f'  {time.perf_counter() - started:.1f}s')
+        return result
+
+    def text(self, words):
+        return ' '.join(self.rng.choices(WORDS, k=words))
+
+    def past(self):
+        # Skewed toward recent dates, like a growing platform
+        return self.now - timedelta(seconds=self.span * self.rng.random() ** 1.5)
+
+    def donor_wallet(self, index):
+        # Lowercased by format_address, as Donation.save() would store it; bulk_create skips save()
+        wallet = self.wallets.get(index)
+        if wallet is None:
+            wallet = self.wallets[index] = blockchain_utils.format_address(f'0x{self.tag:08x}{index:032x}')
+        return wallet
+
+    def reset(self):
+        # One DELETE per table, children first: an ORM delete would collect every row and send its signals.
+        # Stats, rollups and the search index are rebuilt afterwards anyway.
+        with transaction.atomic():
+            for model in (
+                DonationRollup, Donation, OrganizationDonor, OrganizationImpact, OrganizationUpdate,
+                Organization, GlobalDonor,
+            ):
+                queryset = model.objects.all()
+                queryset._raw_delete(queryset.db)
+
+    def create_orgs(self, count):
+        categories = [key for key, _ in Organization.CATEGORIES]
+        ids = []
+        for start in range(0, count, self.batch_size):
+            batch = []
+            for index in range(start, min(start + self.batch_size, count)):
+                category = self.rng.choice(categories)
+                batch.append(Organization(
+                    name=f'{self.text(3).title()} {index}',
+                    category=category,
+                    location=self.rng.choice(LOCATIONS),
+                    description=self.text(12),
+                    long_description=self.text(80),
+                    wallet_address=f'0x{self.tag:08x}{index:032x}',
+                    goal_amount=Decimal(self.rng.randrange(10, 500) * 1000),
+                    image_emoji=EMOJIS[category],
+                    verified=self.rng.random() < 0.6,
+                    featured=self.rng.random() < 0.02,
+                    founded_year=self.rng.randint(1980, 2024),
+                    created_at=self.past(),
+                ))
+            created = Organization.objects.bulk_create(batch)
+            if created and created[0].pk is None:
+                created = Organization.objects.filter(wallet_address__in=[org.wallet_address for org in batch])
+            ids.extend(org.pk for org in created)
+        return ids
+
+    def create_children(self, org_ids, impacts, updates):
+        impact_batch, update_batch = [], []
+        for org_id in org_ids:
+            impact_batch.extend(
+                OrganizationImpact(organization_id=org_id, metric=f'{self.rng.randint(10, 50000):,} {self.text(2)}', order=order)
+                for order in range(impacts)
+            )
+            update_batch.extend(
+                OrganizationUpdate(organization_id=org_id, title=self.text(4).title(), content=self.text(30), created_at=self.past())
+                for _ in range(updates)
+            )
+            if len(impact_batch) + len(update_batch) >= self.batch_size:
+                OrganizationImpact.objects.bulk_create(impact_batch)
+                OrganizationUpdate.objects.bulk_create(update_batch)
+                impact_batch, update_batch = [], []
+        OrganizationImpact.objects.bulk_create(impact_batch)
+        OrganizationUpdate.objects.bulk_create(update_batch)
+
+    def donation_counts(self, orgs, total, skew):
+        """Split total across orgs by a Zipf law over a random popularity ranking"""
+        weights = [1 / (rank + 1) ** skew for rank in range(orgs)]
+        self.rng.shuffle(weights)
+        scale = total / sum(weights)
+        counts = [int(weight * scale) for weight in weights]
+        for index in self.rng.choices(range(orgs), weights=weights, k=total - sum(counts)):
+            counts[index] += 1
+        return counts
+
+    def create_donations(self, org_ids, total, donors, skew, completed_share):
+        counts = self.donation_counts(len(org_ids), total, skew)
+        buffer, org_donors, org_updates = [], [], []
+        all_wallets = set()
+        serial = 0
+        statuses = ['completed', 'pending', 'failed']
+        status_weights = [completed_share, (1 - completed_share) * 0.7, (1 - completed_share) * 0.3]
+
+        for org_id, count in zip(org_ids, counts):
+            raised = Decimal(0)
+            wallets = set()
+            for _ in range(count):
+                # Few donors give often, most give once
+                wallet = self.donor_wallet(int(donors * self.rng.random() ** 3))
+                # Long-tailed, within the two integer digits Donation.amount allows
+                amount = Decimal(f'{min(self.rng.lognormvariate(1, 1.1), 99.99):.6f}')
+                status = self.rng.choices(statuses, weights=status_weights)[0]
+                created_at = self.past()
+                serial += 1
+
+                donation = Donation(
+                    organization_id=org_id,
+                    donor_wallet=wallet,
+                    amount=amount,
+                    amount_usd=amount.quantize(Decimal('0.01')),
+                    status=status,
+                    created_at=created_at,
+                )
+                if status == 'completed':
+                    donation.transaction_hash = f'0x{self.tag:08x}{serial:056x}'
+                    donation.completed_at = created_at + timedelta(seconds=self.rng.randint(5, 900))
+                    raised += amount
+                    wallets.add(wallet)
+                buffer.append(donation)
+
+                if len(buffer) >= self.batch_size:
+                    self.flush(buffer, org_donors, org_updates)
+                    buffer, org_donors, org_updates = [], [], []
+
+            org_donors.extend(OrganizationDonor(organization_id=org_id, donor_wallet=wallet) for wallet in wallets)
+            org_updates.append(Organization(
+                id=org_id,
+                raised_amount=raised.quantize(Decimal('0.01')),
+                donor_count=len(wallets),
+                donor_sketch=HyperLogLog().update(wallets).to_bytes(),
+            ))
+            all_wallets |= wallets
+
+        self.flush(buffer, org_donors, org_updates)
+        GlobalDonor.objects.bulk_create(
+            [GlobalDonor(donor_wallet=wallet) for wallet in all_wallets],
+            batch_size=self.batch_size,
+            ignore_conflicts=True
+        )
+
+    def flush(self, donations, org_donors, org_updates):
+        with transaction.atomic():
+            Donation.objects.bulk_create(donations, batch_size=self.batch_size)
+            OrganizationDonor.objects.bulk_create(org_donors, batch_size=self.batch_size)
+            Organization.objects.bulk_update(
+                org_updates, ['raised_amount', 'donor_count', 'donor_sketch'], batch_size=self.batch_size
+            )
@@ -0,0 +1,41 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from api.ingest import DEFAULT_BATCH_SIZE, ingest_donations, iter_csv, iter_ndjson
+
+class Command(BaseCommand):
+    help = 'Import donations from an NDJSON or CSV file in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or '-' for stdin")
+        parser.add_argument('--format', choices=['ndjson', 'csv'], help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format']
+        if not fmt:
+            if path.endswith('.csv'):
+                fmt = 'csv'
+            elif path.endswith(('.ndjson', '.jsonl')):
+                fmt = 'ndjson'
+            else:
+                raise CommandError('Could not infer the format; pass --format')
+        
+        parse = iter_csv if fmt == 'csv' else iter_ndjson
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        
+        def progress(result):
+            self.stdout.write(f"  {result['created']} created, {result['failed']} failed")
+        
+        try:
+            result = ingest_donations(parse(stream), batch_size=options['batch_size'], on_batch=progress)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        
+        for error in result['errors']:
+            self.stdout.write(self.style.WARNING(f"line {error['line']}: {error['errors']}"))
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['created']} donations ({result['failed']} failed)"
+        ))
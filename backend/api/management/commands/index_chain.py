@@ -0,0 +1,44 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from blockchain.indexer import JsonRpcClient, TransferIndexer
+from blockchain.verifier import RPCError
+
+class Command(BaseCommand):
+    help = 'Complete pending donations from ERC-20 Transfer logs to organization wallets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rpc-url', default=None, help='Defaults to CHAIN_RPC_URL')
+        parser.add_argument('--from-block', type=int, default=None, help='Start block when no checkpoint exists yet')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls')
+        parser.add_argument('--once', action='store_true', help='Catch up to the safe head and exit')
+
+    def handle(self, *args, **options):
+        client = JsonRpcClient(options['rpc_url'] or settings.CHAIN_RPC_URL, timeout=settings.CHAIN_RPC_TIMEOUT)
+        indexer = TransferIndexer(
+            client,
+            settings.CHAIN_TOKEN_ADDRESS,
+            decimals=settings.CHAIN_TOKEN_DECIMALS,
+            reorg_depth=settings.CHAIN_REORG_DEPTH,
+        )
+        
+        while True:
+            try:
+                blocks = indexer.run_once(start_block=options['from_block'])
+            except RPCError as exc:
+                self.stderr.write(self.style.ERROR(f'RPC error: {exc}'))
+                blocks = 0
+                if options['once']:
+                    raise
+            
+            if blocks:
+                stats = indexer.stats
+                rate = stats['blocks'] / stats['seconds'] if stats['seconds'] else 0
+                self.stdout.write(
+                    f"+{blocks} blocks (checkpoint {indexer.checkpoint().block_number}, span {indexer.span}) | "
+                    f"{stats['logs']} logs, {stats['completed']} completed, {rate:.0f} blocks/s"
+                )
+            
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from donations.models import GlobalStats
+
+class Command(BaseCommand):
+    help = 'Rebuild the global donation stats rollup from completed donations'
+
+    def handle(self, *args, **kwargs):
+        stats = GlobalStats.rebuild()
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt global stats: {stats.total_donations} donations, '
+            f'{stats.unique_donors} donors, {stats.organizations_count} organizations'
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from donations.models import DonationRollup
+
+class Command(BaseCommand):
+    help = 'Rebuild hourly and daily donation rollups from completed donations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('org_ids', nargs='*', type=int, help='Only rebuild these organization ids')
+
+    def handle(self, *args, **options):
+        written = DonationRollup.rebuild(organization_ids=options['org_ids'] or None)
+        
+        scope = f"organizations {', '.join(map(str, options['org_ids']))}" if options['org_ids'] else 'all organizations'
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} rollup buckets for {scope}'))
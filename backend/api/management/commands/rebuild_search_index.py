@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from organizations.models import Organization
+from organizations.search import get_backend
+
+class Command(BaseCommand):
+    help = 'Rebuild the organization full-text search index'
+
+    def handle(self, *args, **kwargs):
+        backend = get_backend()
+        if backend is None:
+            self.stdout.write(self.style.WARNING('No full-text backend for this database; search uses icontains'))
+            return
+        
+        backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {Organization.objects.count()} organizations'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from organizations.models import Organization
+
+class Command(BaseCommand):
+    help = 'Recompute raised amount and donor count for organizations from completed donations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('org_ids', nargs='*', type=int, help='Only recompute these organization ids')
+
+    def handle(self, *args, **options):
+        queryset = Organization.objects.all()
+        if options['org_ids']:
+            queryset = queryset.filter(id__in=options['org_ids'])
+        
+        count = 0
+        for org in queryset.iterator():
+            before = (org.raised_amount, org.donor_count)
+            org.update_stats()
+            count += 1
+            
+            if before != (org.raised_amount, org.donor_count):
+                self.stdout.write(self.style.WARNING(
+                    f'~ {org.name}: raised {before[0]} -> {org.raised_amount}, donors {before[1]} -> {org.donor_count}'
+                ))
+        
+        self.stdout.write(self.style.SUCCESS(f'Recomputed stats for {count} organizations'))
@@ -0,0 +1,244 @@
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_current = contextvars.ContextVar('api_request_metrics', default=None)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Registry:
+    """
+    In-process metrics keyed by (route, method), rendered in Prometheus text format.
+
+    Each worker process keeps its own registry; scrape every worker (or
+    aggregate in Prometheus) when running several.
+    """
+    HISTOGRAMS = {
+        'http_request_duration_seconds': ('Wall time per request', DURATION_BUCKETS),
+        'http_request_db_queries': ('Database queries per request', QUERY_BUCKETS),
+        'http_request_db_duration_seconds': ('Time spent in database queries per request', DURATION_BUCKETS),
+        'http_request_serialize_duration_seconds': ('Time spent serializing and rendering per request', DURATION_BUCKETS),
+        'http_response_size_bytes': ('Response body size (non-streaming responses)', SIZE_BUCKETS),
+    }
+    COUNTERS = {
+        'http_requests_total': 'Requests by route, method and status',
+        'http_requests_over_query_threshold_total': 'Requests that ran more queries than their route\'s query budget',
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {name: {} for name in self.HISTOGRAMS}
+        self._counters = {name: {} for name in self.COUNTERS}
+
+    def observe(self, name, labels, value):
+        with self._lock:
+            series = self._histograms[name]
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram(self.HISTOGRAMS[name][1])
+            histogram.observe(value)
+
+    def inc(self, name, labels):
+        with self._lock:
+            self._counters[name][labels] = self._counters[name].get(labels, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {name: {} for name in self.HISTOGRAMS}
+            self._counters = {name: {} for name in self.COUNTERS}
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, (help_text, buckets) in self.HISTOGRAMS.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for labels, histogram in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(buckets + (float('inf'),), histogram.counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                        lines.append(f'{name}_bucket{_labels(labels, le=le)} {cumulative}')
+                    lines.append(f'{name}_sum{_labels(labels)} {histogram.sum:.6g}')
+                    lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+            for name, help_text in self.COUNTERS.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} counter')
+                for labels, value in sorted(self._counters[name].items()):
+                    lines.append(f'{name}{_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+registry = Registry()
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db_seconds', 'serialize_seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+def _count_query(execute, sql, params, many, context):
+    # Database connections are per thread, but the request's metrics follow its context into sync_to_async
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """connection_created receiver: keep the query counter on every connection, in any thread"""
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+@contextmanager
+def timer():
+    """Attribute the enclosed block to the current request's serialize time (no-op outside a request)"""
+    metrics = _current.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if metrics is not None:
+            metrics.serialize_seconds += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """
+    Records per-route wall time, query count and time, serialize time and
+    response size, adds a Server-Timing header and flags requests above
+    their route's query budget (METRICS_QUERY_BUDGETS, else
+    METRICS_QUERY_THRESHOLD).
+
+    Sync and async capable, so under ASGI it doesn't push every request
+    through a thread. Queries are counted by an execute wrapper installed
+    on each connection (install_query_counter) that reports to the current
+    request's context, so ORM work an async view hands to sync_to_async
+    counts too. Serialize time covers DRF response rendering plus blocks
+    wrapped in metrics.timer().
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.enabled = getattr(settings, 'METRICS_ENABLED', True)
+        self.server_timing = getattr(settings, 'METRICS_SERVER_TIMING', True)
+        self.query_threshold = getattr(settings, 'METRICS_QUERY_THRESHOLD', 0)
+        self.query_budgets = getattr(settings, 'METRICS_QUERY_BUDGETS', {})
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        with self.measure() as metrics:
+            response = self.get_response(request)
+        self.record(request, response, metrics, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        started = time.perf_counter()
+        with self.measure() as metrics:
+            response = await self.get_response(request)
+        self.record(request, response, metrics, time.perf_counter() - started)
+        return response
+
+    @contextmanager
+    def measure(self):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            yield metrics
+        finally:
+            _current.reset(token)
+
+    def process_template_response(self, request, response):
+        # DRF responses render after the view returns; time it as serialization
+        metrics = _current.get()
+        if metrics is not None:
+            render = response.render
+
+            def timed_render():
+                with timer():
+                    return render()
+            response.render = timed_render
+        return response
+
+    def record(self, request, response, metrics, elapsed):
+        match = request.resolver_match
+        route = match.view_name if match else '<unmatched>'
+        labels = (('route', route), ('method', request.method))
+
+        registry.observe('http_request_duration_seconds', labels, elapsed)
+        registry.observe('http_request_db_queries', labels, metrics.queries)
+        registry.observe('http_request_db_duration_seconds', labels, metrics.db_seconds)
+        registry.observe('http_request_serialize_duration_seconds', labels, metrics.serialize_seconds)
+        if not response.streaming:
+            registry.observe('http_response_size_bytes', labels, len(response.content))
+        registry.inc('http_requests_total', labels + (('status', response.status_code),))
+
+        budget = self.query_budgets.get(match.url_name if match else None, self.query_threshold)
+        if budget and metrics.queries > budget:
+            registry.inc('http_requests_over_query_threshold_total', labels)
+            logger.warning(
+                '%s %s (%s) ran %d queries (budget %d) in %.1f ms',
+                request.method, request.path, route, metrics.queries, budget, metrics.db_seconds * 1000
+            )
+
+        if self.server_timing:
+            response['Server-Timing'] = ', '.join([
+                f'app;dur={elapsed * 1000:.1f}',
+                f'db;dur={metrics.db_seconds * 1000:.1f};desc="{metrics.queries} queries"',
+                f'serialize;dur={metrics.serialize_seconds * 1000:.1f}',
+            ])
@@ -0,0 +1,161 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+class StandardPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on a tuple of ordering fields.
+
+    Each page seeks past the last row of the previous one with a
+    (f1, f2, ...) > (v1, v2, ...) predicate, so there is no COUNT(*) and
+    no OFFSET scan and deep pages cost the same as the first one.
+    Forward-only, which is what feeds and exports need.
+    """
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering):
+        self.ordering = tuple(ordering)
+
+    @classmethod
+    def requested(cls, request):
+        params = request.query_params
+        return params.get(cls.mode_query_param) == 'cursor' or cls.cursor_query_param in params
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.seek_filter(position))
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        return self.page
+
+    def seek_filter(self, position):
+        """Expand the row comparison into an OR of prefix-equal, next-greater terms"""
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            term = Q(**{f'{name}__{lookup}': position[index]})
+            for prev_field, prev_value in zip(self.ordering[:index], position):
+                term &= Q(**{prev_field.lstrip('-'): prev_value})
+            condition |= term
+        return condition
+
+    def encode_cursor(self, obj):
+        values = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            value = obj[name] if isinstance(obj, dict) else getattr(obj, name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            values = json.loads(urlsafe_b64decode(encoded.encode()))
+            if len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': None,
+            'results': data
+        })
+
+
+class KeysetPaginationMixin:
+    """Opt into KeysetPagination with ?pagination=cursor; page numbers stay the default"""
+    keyset_ordering = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.keyset_ordering and self.action == 'list' and KeysetPagination.requested(self.request):
+                self._paginator = KeysetPagination(self.keyset_ordering)
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+
+async def apaginate(request, queryset, page_size=StandardPagination.page_size, max_page_size=StandardPagination.max_page_size):
+    """
+    Page-number pagination for async views using the async ORM.
+
+    Mirrors StandardPagination's payload; returns (items, payload) where
+    payload lacks 'results'. Raises NotFound for out-of-range pages, as
+    StandardPagination does.
+    """
+    try:
+        page_size = min(max(int(request.GET['page_size']), 1), max_page_size)
+    except (KeyError, ValueError):
+        pass
+    try:
+        page = int(request.GET.get('page', 1))
+    except ValueError:
+        raise NotFound('Invalid page.')
+
+    count = await queryset.acount()
+    pages = max(1, -(-count // page_size))
+    if page < 1 or page > pages:
+        raise NotFound('Invalid page.')
+
+    offset = (page - 1) * page_size
+    items = [obj async for obj in queryset[offset:offset + page_size]]
+
+    url = request.build_absolute_uri()
+    return items, {
+        'count': count,
+        'next': replace_query_param(url, 'page', page + 1) if page < pages else None,
+        'previous': (
+            None if page == 1
+            else remove_query_param(url, 'page') if page == 2
+            else replace_query_param(url, 'page', page - 1)
+        ),
+    }
+
@@ -0,0 +1,40 @@
+import json
+import re
+from decimal import Decimal
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Numbers with more significant digits than a float holds (e.g. 18-decimal token amounts)
+LONG_NUMBER_RE = re.compile(rb'[0-9][0-9.]{16,}')
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSONParser backed by orjson.
+
+    orjson parses numbers to float, so bodies containing numbers too long for
+    a float are parsed with the stdlib using Decimal instead, keeping amounts exact.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        body = stream.read() if stream is not None else b''
+        if encoding.lower().replace('-', '') != 'utf8':
+            body = body.decode(encoding).encode('utf-8')
+
+        try:
+            if LONG_NUMBER_RE.search(body):
+                return json.loads(body, parse_float=Decimal)
+            return orjson.loads(body)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
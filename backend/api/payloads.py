@@ -0,0 +1,24 @@
+"""Response fragments shared by the DRF views, the async views and the live feed"""
+from decimal import Decimal
+
+
+def decimal_string(value, places):
+    """
+    value as the string DRF's DecimalField renders: quantized to places with
+    the context's rounding (half-even) and in fixed-point, never exponent, form
+    """
+    if value is None:
+        return None
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value).strip())
+    return '{:f}'.format(value.quantize(Decimal(10) ** -places))
+
+
+def stats_payload(stats):
+    return {
+        'total_amount_sbc': float(stats.total_amount),
+        'total_amount_usd': float(stats.total_amount_usd),
+        'total_donations': stats.total_donations,
+        'unique_donors': stats.unique_donors,
+        'organizations_count': stats.organizations_count
+    }
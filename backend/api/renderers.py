@@ -0,0 +1,40 @@
+from decimal import Decimal
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_fallback_encoder = encoders.JSONEncoder()
+
+
+def _default(obj):
+    # Keep amounts exact; float() would round 18-decimal token amounts
+    if isinstance(obj, Decimal):
+        return str(obj)
+    return _fallback_encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer backed by orjson.
+
+    Datetimes go through DRF's encoder so the output format is unchanged;
+    Decimals that reach the encoder are written as exact strings. Indented
+    output (browsable API, ?indent=) falls back to the stock renderer.
+    """
+    options = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_default, option=self.options)
+        # Match JSONRenderer, which escapes these so the output stays a strict JavaScript subset
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
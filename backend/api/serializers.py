@@ -1,6 +1,20 @@
+from django.utils import timezone
 from rest_framework import serializers
 from organizations.models import Organization, OrganizationImpact, OrganizationUpdate
 from donations.models import Donation
+from blockchain.web3_client import blockchain_utils
+from .payloads import decimal_string
+
+
+def format_datetime(value):
+    # Same output as DRF's DateTimeField with the default format
+    if value is None:
+        return None
+    value = timezone.localtime(value).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
 
 class OrganizationImpactSerializer(serializers.ModelSerializer):
     class Meta:
@@ -16,8 +30,10 @@ class OrganizationUpdateSerializer(serializers.ModelSerializer):
     
     def get_date(self, obj):
         """Format date as relative time"""
-        from django.utils import timezone
-        diff = timezone.now() - obj.created_at
+        # One clock reading per response rather than per update
+        if 'now' not in self.context:
+            self.context['now'] = timezone.now()
+        diff = self.context['now'] - obj.created_at
         
         if diff.days == 0:
             hours = diff.seconds // 3600
@@ -34,6 +50,25 @@ class OrganizationUpdateSerializer(serializers.ModelSerializer):
         else:
             return obj.created_at.strftime('%B %d, %Y')
 
+class OrganizationUpdateRawSerializer(serializers.ModelSerializer):
+    """Updates without the humanized date, so payloads stay stable over time"""
+    class Meta:
+        model = OrganizationUpdate
+        fields = ['id', 'title', 'content', 'created_at']
+
+
+def detail_context(params):
+    """
+    Detail-response options from query params:
+    ?dates=client returns created_at only plus a server 'now' for clients to humanize,
+    ?updates=none leaves updates out (see /organizations/{id}/updates/).
+    """
+    return {
+        'client_dates': params.get('dates') == 'client',
+        'embed_updates': params.get('updates') != 'none',
+    }
+
+
 class OrganizationListSerializer(serializers.ModelSerializer):
     """Serializer for organization list view"""
     image = serializers.CharField(source='image_emoji')
@@ -66,6 +101,20 @@ class OrganizationDetailSerializer(serializers.ModelSerializer):
             'image', 'verified', 'featured', 'raised', 'goal', 'donors',
             'founded', 'impact', 'updates', 'wallet_address'
         ]
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.context.get('embed_updates', True):
+            del fields['updates']
+        elif self.context.get('client_dates'):
+            fields['updates'] = OrganizationUpdateRawSerializer(many=True, read_only=True)
+        return fields
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if self.context.get('client_dates'):
+            data['now'] = format_datetime(timezone.now())
+        return data
 
 class DonationSerializer(serializers.ModelSerializer):
     organization_name = serializers.CharField(source='organization.name', read_only=True)
@@ -79,6 +128,72 @@ class DonationSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'completed_at', 'status']
 
+class TimeseriesPointSerializer(serializers.Serializer):
+    bucket = serializers.DateTimeField()
+    amount = serializers.DecimalField(max_digits=38, decimal_places=18)
+    amount_usd = serializers.DecimalField(max_digits=30, decimal_places=2)
+    donations = serializers.IntegerField()
+    donors = serializers.IntegerField()
+
+class OrganizationListRows:
+    """Read-only fast path producing OrganizationListSerializer output from .values() rows"""
+    values = (
+        'id', 'name', 'category', 'location', 'description', 'image_emoji',
+        'verified', 'featured', 'raised_amount', 'goal_amount', 'donor_count'
+    )
+    
+    @staticmethod
+    def to_representation(row):
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'category': row['category'],
+            'location': row['location'],
+            'description': row['description'],
+            'image': row['image_emoji'],
+            'verified': row['verified'],
+            'featured': row['featured'],
+            'raised': decimal_string(row['raised_amount'], 2),
+            'goal': decimal_string(row['goal_amount'], 2),
+            'donors': row['donor_count'],
+        }
+    
+    @classmethod
+    def serialize(cls, rows):
+        return [cls.to_representation(row) for row in rows]
+
+
+class DonationRows:
+    """Read-only fast path producing DonationSerializer output from .values() rows"""
+    values = (
+        'id', 'organization_id', 'organization__name', 'donor_name', 'donor_email',
+        'donor_wallet', 'amount', 'amount_usd', 'transaction_hash',
+        'status', 'message', 'created_at', 'completed_at'
+    )
+    
+    @staticmethod
+    def to_representation(row):
+        return {
+            'id': row['id'],
+            'organization': row['organization_id'],
+            'organization_name': row['organization__name'],
+            'donor_name': row['donor_name'],
+            'donor_email': row['donor_email'],
+            'donor_wallet': row['donor_wallet'],
+            'amount': decimal_string(row['amount'], 18),
+            'amount_usd': decimal_string(row['amount_usd'], 2),
+            'transaction_hash': row['transaction_hash'],
+            'status': row['status'],
+            'message': row['message'],
+            'created_at': format_datetime(row['created_at']),
+            'completed_at': format_datetime(row['completed_at']),
+        }
+    
+    @classmethod
+    def serialize(cls, rows):
+        return [cls.to_representation(row) for row in rows]
+
+
 class DonationCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Donation
@@ -91,4 +206,35 @@ class DonationCreateSerializer(serializers.ModelSerializer):
         return Donation.objects.create(**validated_data)
 
 
+class DonationImportSerializer(serializers.ModelSerializer):
+    """Row-level validation for bulk ingestion; lookups against the DB happen once per batch"""
+    organization = serializers.IntegerField(source='organization_id')
+    
+    class Meta:
+        model = Donation
+        fields = [
+            'organization', 'donor_name', 'donor_email', 'donor_wallet',
+            'amount', 'amount_usd', 'transaction_hash', 'status', 'message',
+            'created_at', 'completed_at'
+        ]
+        extra_kwargs = {
+            'transaction_hash': {'validators': []},
+        }
+    
+    def validate_donor_wallet(self, value):
+        if not blockchain_utils.validate_eth_address(value):
+            raise serializers.ValidationError('Invalid wallet address')
+        return blockchain_utils.format_address(value)
+    
+    def validate_transaction_hash(self, value):
+        if value and not blockchain_utils.validate_tx_hash(value):
+            raise serializers.ValidationError('Invalid transaction hash')
+        return blockchain_utils.format_tx_hash(value)
+    
+    def validate(self, attrs):
+        if attrs.get('status') == 'completed':
+            if not attrs.get('transaction_hash'):
+                raise serializers.ValidationError({'transaction_hash': 'Required for completed donations'})
+            attrs.setdefault('completed_at', attrs.get('created_at') or timezone.now())
+        return attrs
 
@@ -0,0 +1,38 @@
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from donations.models import Donation, GlobalStats
+from donations.signals import donation_completed
+from organizations.models import Organization, OrganizationImpact, OrganizationUpdate
+from . import live
+
+def _deleted_with_organization(origin):
+    return isinstance(origin, Organization) or getattr(origin, 'model', None) is Organization
+
+@receiver(post_save, sender=OrganizationImpact)
+@receiver(post_delete, sender=OrganizationImpact)
+@receiver(post_save, sender=OrganizationUpdate)
+@receiver(post_delete, sender=OrganizationUpdate)
+def organization_child_changed(sender, instance, origin=None, **kwargs):
+    # Deleted along with the organization itself: there is no parent left to touch
+    if _deleted_with_organization(origin):
+        return
+    # The parent's updated_at is the detail ETag, so it has to move with its impacts and updates
+    Organization.objects.filter(pk=instance.organization_id).update(updated_at=timezone.now())
+
+@receiver(post_save, sender=Donation)
+@receiver(post_delete, sender=Donation)
+def donation_changed(sender, instance, created=False, origin=None, **kwargs):
+    # Part of the donation ETag, bumped in the same transaction. New rows move the newest id instead,
+    # and deleting an organization bumps the version once for all of its donations.
+    if not created and not _deleted_with_organization(origin):
+        GlobalStats.bump()
+
+@receiver(donation_completed)
+def donation_completed_changed(sender, donation=None, organization_ids=(), donations=(), **kwargs):
+    if donation is not None:
+        organization_ids = [donation.organization_id]
+        donations = [donation]
+    transaction.on_commit(partial(live.publish_completions, list(donations), list(organization_ids)))
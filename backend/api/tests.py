@@ -0,0 +1,393 @@
+import logging
+from decimal import Decimal
+from unittest import skipIf
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from api.serializers import DonationRows, DonationSerializer
+from blockchain.web3_client import keccak
+from donations.models import Donation
+from organizations.models import Organization, OrganizationImpact, OrganizationUpdate
+
+
+class EndpointQueryCountTests(TestCase):
+    """
+    Query budget for every router endpoint, with the response cache cold.
+
+    List endpoints are requested at page_size=1 and at max_page_size, and
+    must issue the same queries for both: a related lookup per row would
+    show up as 99 extra queries.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.orgs = []
+        for index in range(3):
+            org = Organization.objects.create(
+                name=f'Org {index}',
+                category='water',
+                location='Nairobi',
+                description='Clean water',
+                wallet_address='0x%040x' % (index + 1),
+            )
+            OrganizationImpact.objects.bulk_create(
+                [OrganizationImpact(organization=org, metric=f'Metric {order}', order=order) for order in range(3)]
+            )
+            OrganizationUpdate.objects.bulk_create(
+                [OrganizationUpdate(organization=org, title=f'Update {order}', content='News') for order in range(3)]
+            )
+            cls.orgs.append(org)
+        cls.org = cls.orgs[0]
+
+        cls.donations = Donation.objects.bulk_create([
+            Donation(
+                organization=cls.orgs[index % 3],
+                donor_wallet='0x%040x' % (100 + index % 7),
+                amount=Decimal('1.5'),
+                amount_usd=Decimal('3'),
+            )
+            for index in range(30)
+        ])
+        Donation.complete_batch([(donation.pk, '0x%064x' % donation.pk) for donation in cls.donations[:20]])
+        cls.pending = cls.donations[20:]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def assertQueries(self, num, method, url, data=None, status=200):
+        with self.assertNumQueries(num):
+            response = getattr(self.client, method)(url, data, format='json')
+        self.assertEqual(response.status_code, status, getattr(response, 'data', None))
+        return response
+
+    def assertFlatList(self, num, url):
+        """Same query count for the smallest and the largest page"""
+        separator = '&' if '?' in url else '?'
+        for page_size in (1, 100):
+            cache.clear()
+            response = self.assertQueries(num, 'get', f'{url}{separator}page_size={page_size}')
+            self.assertEqual(len(response.data['results']), min(page_size, self.expected_rows(url)))
+
+    def expected_rows(self, url):
+        if url.startswith('/api/organizations/?'):
+            return len(self.orgs)
+        if '/updates/' in url:
+            return 3
+        if 'organization=' in url:
+            return Donation.objects.filter(organization=self.org, status='completed').count()
+        return len(self.donations)
+
+    # Organizations
+
+    def test_organization_list(self):
+        self.assertFlatList(3, '/api/organizations/?category=water')
+
+    def test_organization_list_cursor(self):
+        self.assertFlatList(2, '/api/organizations/?pagination=cursor')
+
+    def test_organization_list_cache_hit(self):
+        """A warm response cache answers after the version lookup alone, whatever the filters cost"""
+        url = '/api/organizations/?search=water&category=water'
+        self.client.get(url)
+        self.assertQueries(1, 'get', url)
+
+    def test_organization_detail(self):
+        response = self.assertQueries(4, 'get', f'/api/organizations/{self.org.pk}/')
+        self.assertEqual(len(response.data['impact']), 3)
+        self.assertEqual(len(response.data['updates']), 3)
+
+    def test_organization_detail_without_updates(self):
+        self.assertQueries(3, 'get', f'/api/organizations/{self.org.pk}/?updates=none')
+
+    def test_organization_updates(self):
+        self.assertFlatList(3, f'/api/organizations/{self.org.pk}/updates/?page=1')
+
+    def test_organization_timeseries(self):
+        self.assertQueries(3, 'get', f'/api/organizations/{self.org.pk}/timeseries/')
+
+    def test_category_timeseries(self):
+        response = self.assertQueries(3, 'get', '/api/organizations/timeseries/?category=water')
+        today = response.data['results'][-1]
+        self.assertEqual(today['donations'], 20)
+        self.assertEqual(Decimal(today['amount']), Decimal('30'))
+        # 7 wallets spread over 3 organizations: merged per bucket, not summed per organization
+        self.assertEqual(today['donors'], 7)
+        self.assertEqual(response.data['unique_donors'], 7)
+    
+    def test_category_timeseries_requires_category(self):
+        self.assertQueries(0, 'get', '/api/organizations/timeseries/?category=unknown', status=400)
+
+    def test_organization_create(self):
+        self.assertQueries(7, 'post', '/api/organizations/', {
+            'name': 'New', 'category': 'education', 'location': 'Lima', 'description': 'Schools',
+            'longDescription': 'Schools', 'image': '📚', 'raised': '0', 'goal': '100', 'donors': 0,
+            'founded': None, 'wallet_address': '0x' + '9' * 40,
+        }, status=201)
+
+    def test_organization_update(self):
+        self.assertQueries(9, 'patch', f'/api/organizations/{self.org.pk}/', {'featured': True})
+
+    def test_organization_delete(self):
+        self.assertQueries(12, 'delete', f'/api/organizations/{self.orgs[2].pk}/', status=204)
+
+    # Donations
+
+    def test_donation_list(self):
+        self.assertFlatList(3, '/api/donations/')
+
+    def test_donation_list_cursor(self):
+        self.assertFlatList(2, '/api/donations/?pagination=cursor')
+
+    def test_donation_list_filtered(self):
+        self.assertFlatList(3, f'/api/donations/?organization={self.org.pk}&status=completed')
+
+    def test_donation_detail(self):
+        response = self.assertQueries(2, 'get', f'/api/donations/{self.donations[0].pk}/')
+        self.assertEqual(response.data['organization_name'], self.org.name)
+
+    def test_donation_create(self):
+        self.assertQueries(2, 'post', '/api/donations/', {
+            'organization': self.org.pk, 'donor_wallet': '0x' + '8' * 40, 'amount': '1',
+        }, status=201)
+
+    def test_donation_update(self):
+        self.assertQueries(3, 'patch', f'/api/donations/{self.pending[0].pk}/', {'message': 'Thanks'})
+
+    def test_donation_delete(self):
+        self.assertQueries(3, 'delete', f'/api/donations/{self.pending[0].pk}/', status=204)
+
+    def test_donation_bulk(self):
+        self.client.force_authenticate(User(username='staff', is_staff=True))
+        self.assertQueries(4, 'post', '/api/donations/bulk/', [
+            {'organization': org.pk, 'donor_wallet': '0x%040x' % (900 + index), 'amount': '1'}
+            for index, org in enumerate(self.orgs)
+        ], status=201)
+
+    def test_donation_bulk_requires_staff(self):
+        """Completed rows skip receipt verification, so anonymous callers can't inflate the totals"""
+        raised = Organization.objects.get(pk=self.org.pk).raised_amount
+        self.assertQueries(0, 'post', '/api/donations/bulk/', [{
+            'organization': self.org.pk, 'donor_wallet': '0x' + '7' * 40, 'amount': '1000',
+            'status': 'completed', 'transaction_hash': '0x' + 'b' * 64,
+        }], status=403)
+        self.assertEqual(Organization.objects.get(pk=self.org.pk).raised_amount, raised)
+        self.assertFalse(Donation.objects.filter(transaction_hash='0x' + 'b' * 64).exists())
+
+    def test_donation_complete(self):
+        self.assertQueries(20, 'post', '/api/donations/complete/', {
+            'donation_id': self.pending[0].pk, 'transaction_hash': '0x' + 'a' * 64,
+        })
+
+    def test_donation_complete_batch(self):
+        """One delta per organization, so a batch costs the same whatever its size within those organizations"""
+        counts = []
+        for start, size in ((1, 3), (4, 6)):
+            items = [
+                {'donation_id': donation.pk, 'transaction_hash': '0x%064x' % (10 ** 6 + donation.pk)}
+                for donation in self.pending[start:start + size]
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post('/api/donations/complete/batch/', {'items': items}, format='json')
+            self.assertEqual(response.data['completed'], size)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+
+class RowParityTests(SimpleTestCase):
+    """The .values() fast paths render exactly what the serializers do"""
+
+    def test_donation_amounts(self):
+        org = Organization(pk=1, name='Org')
+        for amount, amount_usd in (
+            (Decimal('0'), Decimal('0')),
+            (Decimal('1E-18'), Decimal('0.01')),
+            (Decimal('1E-7'), Decimal('0.125')),
+            (Decimal('0.0000000000000000125'), Decimal('0.135')),
+            (Decimal('12.5'), None),
+        ):
+            donation = Donation(
+                pk=1, organization=org, donor_wallet='0x' + '1' * 40, amount=amount, amount_usd=amount_usd,
+                created_at=timezone.now(),
+            )
+            row = {name: getattr(donation, name, None) for name in DonationRows.values}
+            row['organization__name'] = org.name
+            with self.subTest(amount=amount, amount_usd=amount_usd):
+                self.assertEqual(DonationRows.to_representation(row), DonationSerializer(donation).data)
+
+
+@skipIf(keccak is None, 'checksum validation needs a keccak implementation')
+class WalletValidationTests(SimpleTestCase):
+    """The checksum flag follows the query-flag convention, so string values mean what they say"""
+    address = '0x' + 'Ab' * 20
+
+    def checksummed(self, data):
+        response = APIClient().post('/api/validate/wallets/', data, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        return 'checksum_valid' in response.data['results'][0]
+
+    def test_checksum_flag(self):
+        self.assertTrue(self.checksummed({'addresses': [self.address], 'checksum': True}))
+        self.assertFalse(self.checksummed({'addresses': [self.address], 'checksum': False}))
+        self.assertFalse(self.checksummed({'addresses': [self.address]}))
+
+    def test_checksum_flag_from_strings(self):
+        for value, expected in (('false', False), ('0', False), ('', False), ('true', True), ('True', True), ('1', True)):
+            with self.subTest(checksum=value):
+                self.assertEqual(self.checksummed({'addresses': [self.address], 'checksum': value}), expected)
+
+
+class ValidatorTests(TestCase):
+    """
+    ETags come from version rows in the database, not per-process state, so a
+    write made through another worker (here: with the local cache cleared
+    and nothing invalidated) still ends 304s.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.org = Organization.objects.create(
+            name='Org', category='water', location='Nairobi', description='Clean water', wallet_address='0x' + '1' * 40
+        )
+        cls.donation = Donation.objects.create(organization=cls.org, donor_wallet='0x' + '2' * 40, amount=Decimal('1'))
+
+    def assertChangedBy(self, url, write):
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        write()
+        cache.clear()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def rename(self):
+        self.org.name = 'Renamed'
+        self.org.save()
+
+    def test_organization_list(self):
+        response = self.assertChangedBy('/api/organizations/', self.rename)
+        self.assertEqual(response.data['results'][0]['name'], 'Renamed')
+
+    def test_organization_list_delete(self):
+        other = Organization.objects.create(
+            name='Other', category='water', location='Lima', description='Wells', wallet_address='0x' + '3' * 40
+        )
+        self.assertChangedBy('/api/organizations/', lambda: Organization.objects.filter(pk=other.pk).delete())
+
+    def test_category_stats(self):
+        def move():
+            self.org.category = 'education'
+            self.org.save(update_fields=['category', 'updated_at'])
+        self.assertChangedBy('/api/stats/?category=education', move)
+
+    def test_donations_follow_organization_renames(self):
+        response = self.assertChangedBy(f'/api/donations/{self.donation.pk}/', self.rename)
+        self.assertEqual(response.data['organization_name'], 'Renamed')
+
+    def test_donation_edit(self):
+        def edit():
+            self.donation.message = 'Thanks'
+            self.donation.save()
+        self.assertChangedBy('/api/donations/', edit)
+
+
+class AsyncParityTests(TestCase):
+    """The /api/async/ twins answer the same URL with the same body as the DRF views"""
+
+    @classmethod
+    def setUpTestData(cls):
+        org = Organization.objects.create(
+            name='Org', category='water', location='Nairobi', description='Clean water', wallet_address='0x' + '1' * 40
+        )
+        donation = Donation.objects.create(organization=org, donor_wallet='0x' + '2' * 40, amount=Decimal('1.5'))
+        donation.complete('0x' + 'a' * 64)
+
+    def assertSameAnswer(self, path, status=200):
+        sync, asynchronous = self.client.get(f'/api/{path}'), self.client.get(f'/api/async/{path}')
+        self.assertEqual((asynchronous.status_code, asynchronous['Content-Type']), (status, 'application/json'))
+        self.assertEqual(sync.status_code, status)
+        self.assertEqual(asynchronous.json(), sync.json())
+
+    def test_stats(self):
+        self.assertSameAnswer('stats/')
+
+    def test_category_stats(self):
+        self.assertSameAnswer('stats/?category=water')
+        self.assertSameAnswer('stats/?category=education')
+
+    def test_missing_organization(self):
+        self.assertSameAnswer('organizations/999999/', status=404)
+
+    def test_page_out_of_range(self):
+        self.assertSameAnswer('organizations/?page=5', status=404)
+        self.assertSameAnswer('donations/?page=x', status=404)
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        org = Organization.objects.create(
+            name='Org', category='water', location='Nairobi', description='Clean water', wallet_address='0x' + '1' * 40
+        )
+        Donation.objects.bulk_create([
+            Donation(organization=org, donor_wallet='0x%040x' % index, amount=Decimal('1'), message='=1+1')
+            for index in range(5)
+        ])
+
+    async def test_asgi_streams_without_buffering(self):
+        """Under ASGI the body must be an async iterator, or Django collects it with sync_to_async(list)"""
+        expected = await sync_to_async(self.export)()
+        response = await self.async_client.get('/api/donations/export/?output=ndjson')
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(body, expected)
+        self.assertEqual(len(body.splitlines()), 5)
+
+    def export(self):
+        response = self.client.get('/api/donations/export/?output=ndjson')
+        self.assertFalse(response.is_async)
+        return b''.join(response.streaming_content)
+
+
+class MetricsMiddlewareTests(TestCase):
+    @override_settings(DEBUG=True)
+    async def test_async_requests_stay_async(self):
+        """Django logs (in DEBUG) each sync-only middleware it wraps in a thread"""
+        with self.assertLogs('django.request', 'DEBUG') as logs:
+            logging.getLogger('django.request').debug('start')
+            response = await self.async_client.get('/api/async/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([line for line in logs.output if 'MetricsMiddleware' in line], logs.output)
+        # The ORM work ran in a sync_to_async thread and is still counted
+        self.assertIn('"1 queries"', response['Server-Timing'])
+
+    def test_route_budget(self):
+        org = Organization.objects.create(
+            name='Org', category='water', location='Nairobi', description='Clean water', wallet_address='0x' + '1' * 40
+        )
+        donation = Donation.objects.create(organization=org, donor_wallet='0x' + '2' * 40, amount=Decimal('1'))
+        with self.assertNoLogs('api.metrics', 'WARNING'):
+            response = APIClient().post('/api/donations/complete/', {
+                'donation_id': donation.pk, 'transaction_hash': '0x' + 'a' * 64,
+            }, format='json')
+        self.assertEqual(response.status_code, 200)
+
+
+class LiveFeedTests(TestCase):
+    def test_wsgi_is_refused(self):
+        """Under WSGI the stream would block a worker forever without sending a byte"""
+        response = self.client.get('/api/async/live/')
+        self.assertEqual(response.status_code, 503)
+
+    async def test_asgi_streams(self):
+        response = await self.async_client.get('/api/async/live/?organization=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b'retry: '))
+        await stream.aclose()
@@ -1,18 +1,33 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 
 router = DefaultRouter()
 router.register(r'organizations', views.OrganizationViewSet, basename='organization')
 router.register(r'donations', views.DonationViewSet, basename='donation')
 
 urlpatterns = [
+    # Ahead of the router, which would otherwise treat 'export' as a donation pk
+    path('donations/export/', views.export_donations, name='donation-export'),
+    
     path('', include(router.urls)),
     
     path('validate/wallet/', views.validate_wallet, name='validate-wallet'),
     path('validate/transaction/', views.validate_transaction, name='validate-transaction'),
+    path('validate/wallets/', views.validate_wallets, name='validate-wallets'),
+    path('validate/transactions/', views.validate_transactions, name='validate-transactions'),
     
     path('stats/', views.get_donation_stats, name='donation-stats'),
     
     path('health/', views.health_check, name='health-check'),
+    path('health/live/', views.liveness, name='health-live'),
+    path('health/ready/', views.readiness, name='health-ready'),
+    path('metrics/', views.metrics_view, name='metrics'),
+    
+    path('async/organizations/', async_views.organization_list, name='async-organization-list'),
+    path('async/organizations/<int:pk>/', async_views.organization_detail, name='async-organization-detail'),
+    path('async/donations/', async_views.donation_list, name='async-donation-list'),
+    path('async/stats/', async_views.donation_stats, name='async-donation-stats'),
+    path('async/health/', async_views.health_check, name='async-health-check'),
+    path('async/live/', async_views.live_feed, name='async-live'),
 ]
@@ -1,83 +1,354 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
 from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, action
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Sum
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import Sum, Count
-from organizations.models import Organization
-from donations.models import Donation
-from blockchain.web3_client import blockchain_utils
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_GET
+from organizations.models import Organization, OrganizationUpdate
+from organizations.search import search_organizations
+from donations.models import Donation, DonationCompletionError, DonationRollup, GlobalStats
+from blockchain.verifier import CONFIRMED, MESSAGES, RPCError, get_receipt_verifier
+from blockchain.web3_client import blockchain_utils, keccak
 
+from . import cache as api_cache
+from . import conditional, export, health, ingest, metrics
+from .pagination import KeysetPaginationMixin, StandardPagination
+from .payloads import stats_payload
 from .serializers import (
     OrganizationListSerializer,
     OrganizationDetailSerializer,
     DonationSerializer,
     DonationCreateSerializer,
+    DonationRows,
+    OrganizationListRows,
+    OrganizationUpdateRawSerializer,
+    TimeseriesPointSerializer,
+    detail_context,
+    format_datetime,
 )
-class StandardPagination(PageNumberPagination):
-    page_size = 20
-    page_size_query_param = 'page_size'
-    max_page_size = 100
-class OrganizationViewSet(viewsets.ModelViewSet):
+
+API_VERSION = '1.0.0'
+MAX_BATCH_COMPLETIONS = 500
+MAX_BATCH_VALIDATIONS = 10000
+MAX_TIMESERIES_POINTS = 2000
+DEFAULT_TIMESERIES_SPAN = {
+    'hour': timedelta(hours=48),
+    'day': timedelta(days=30),
+}
+
+
+def _item_error(donation_id, tx_hash, message):
+    return {'donation_id': donation_id, 'transaction_hash': tx_hash, 'status': 'error', 'error': message}
+
+
+def _parse_bound(value):
+    """Aware datetime from an ISO date or datetime query param (naive values are UTC)"""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+def _timeseries_window(params):
+    """(granularity, start, end) from timeseries query params; ValueError carries the 400 message"""
+    granularity = params.get('granularity', 'day')
+    if granularity not in DonationRollup.GRANULARITIES:
+        raise ValueError(f"granularity must be one of: {', '.join(DonationRollup.GRANULARITIES)}")
+    
+    try:
+        end = _parse_bound(params['end']) if 'end' in params else timezone.now()
+        start = _parse_bound(params['start']) if 'start' in params else end - DEFAULT_TIMESERIES_SPAN[granularity]
+    except ValueError:
+        raise ValueError('start and end must be ISO 8601 dates or datetimes') from None
+    
+    if start >= end:
+        raise ValueError('start must be before end')
+    if (end - start) / DonationRollup.GRANULARITIES[granularity] > MAX_TIMESERIES_POINTS:
+        raise ValueError(f'At most {MAX_TIMESERIES_POINTS} {granularity} buckets per request')
+    return granularity, start, end
+
+
+def filter_organizations(queryset, params):
+    category = params.get('category', None)
+    if category:
+        queryset = queryset.filter(category=category)
+    
+    featured = params.get('featured', None)
+    if featured is not None:
+        queryset = queryset.filter(featured=featured.lower() == 'true')
+    
+    verified = params.get('verified', None)
+    if verified is not None:
+        queryset = queryset.filter(verified=verified.lower() == 'true')
+    
+    search = params.get('search', None)
+    if search:
+        queryset = search_organizations(queryset, search)
+    
+    return queryset
+
+
+def filter_donations(queryset, params):
+    org_id = params.get('organization', None)
+    if org_id:
+        queryset = queryset.filter(organization_id=org_id)
+    
+    donor_wallet = params.get('donor_wallet', None)
+    if donor_wallet:
+        queryset = queryset.filter(donor_wallet=blockchain_utils.format_address(donor_wallet))
+    
+    donation_status = params.get('status', None)
+    if donation_status:
+        queryset = queryset.filter(status=donation_status)
+    
+    return queryset
+
+
+class FastListMixin:
+    """List from .values() rows through a lean row serializer instead of model instances"""
+    list_rows = None
+    
+    def list(self, request, *args, **kwargs):
+        fields = list(self.list_rows.values)
+        # Keyset cursors are encoded from the last row, so it must carry the ordering fields
+        for field in getattr(self, 'keyset_ordering', None) or ():
+            if field.lstrip('-') not in fields:
+                fields.append(field.lstrip('-'))
+        queryset = self.filter_queryset(self.get_queryset()).values(*fields)
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            with metrics.timer():
+                data = self.list_rows.serialize(page)
+            return self.get_paginated_response(data)
+        rows = list(queryset)
+        with metrics.timer():
+            data = self.list_rows.serialize(rows)
+        return Response(data)
+
+
+class OrganizationViewSet(FastListMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = Organization.objects.all()
     pagination_class = StandardPagination
+    keyset_ordering = ('-featured', '-created_at', '-id')
+    list_rows = OrganizationListRows
     
     def get_serializer_class(self):
         if self.action == 'list':
             return OrganizationListSerializer
         return OrganizationDetailSerializer
     
+    def list(self, request, *args, **kwargs):
+        etag = conditional.make_etag(request, conditional.stats_version())
+        not_modified = conditional.not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        
+        key = api_cache.response_key('list', request, etag)
+        data = api_cache.get_response(key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            api_cache.set_response(key, data)
+        return conditional.set_validators(Response(data), request, etag)
+    
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs[self.lookup_field]
+        updated_at = (
+            Organization.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+            if str(pk).isdigit() else None
+        )
+        if updated_at is None:
+            # Let the normal path answer the 404
+            return super().retrieve(request, *args, **kwargs)
+        
+        options = detail_context(request.query_params)
+        etag, last_modified = conditional.organization_validators(
+            request, updated_at, clock=options['embed_updates'] or options['client_dates']
+        )
+        not_modified = conditional.not_modified(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        
+        key = api_cache.response_key('detail', request, etag)
+        data = api_cache.get_response(key)
+        if data is None:
+            data = super().retrieve(request, *args, **kwargs).data
+            api_cache.set_response(key, data)
+        return conditional.set_validators(Response(data), request, etag, last_modified)
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context.update(detail_context(self.request.query_params))
+        return context
+    
     def get_queryset(self):
-        queryset = Organization.objects.all()
-        
-        category = self.request.query_params.get('category', None)
-        if category:
-            queryset = queryset.filter(category=category)
-        
-        featured = self.request.query_params.get('featured', None)
-        if featured is not None:
-            queryset = queryset.filter(featured=featured.lower() == 'true')
-        
-        verified = self.request.query_params.get('verified', None)
-        if verified is not None:
-            queryset = queryset.filter(verified=verified.lower() == 'true')
-        
-        search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                name__icontains=search
-            ) | queryset.filter(
-                description__icontains=search
+        queryset = Organization.objects.defer('donor_sketch')
+        
+        if self.action in ('updates', 'timeseries'):
+            return queryset.only('id', 'updated_at')
+        if self.action in ('retrieve', 'update', 'partial_update'):
+            queryset = queryset.prefetch_related('impacts')
+            if detail_context(self.request.query_params)['embed_updates']:
+                queryset = queryset.prefetch_related('updates')
+        
+        return filter_organizations(queryset, self.request.query_params)
+    
+    @action(detail=True, methods=['get'])
+    def updates(self, request, pk=None):
+        """Paginated updates for an organization, with created_at only plus the server's 'now'"""
+        org = self.get_object()
+        etag, last_modified = conditional.organization_validators(request, org.updated_at, clock=True)
+        not_modified = conditional.not_modified(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        
+        page = self.paginate_queryset(OrganizationUpdate.objects.filter(organization=org))
+        serializer = OrganizationUpdateRawSerializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
+        response.data['now'] = format_datetime(timezone.now())
+        return conditional.set_validators(response, request, etag, last_modified)
+    
+    @action(detail=True, methods=['get'])
+    def timeseries(self, request, pk=None):
+        """Hourly or daily amount, count and unique donors, read from rollups only"""
+        org = self.get_object()
+        # Without an explicit end the window follows the clock
+        etag, last_modified = conditional.organization_validators(
+            request, org.updated_at, clock='end' not in request.query_params
+        )
+        not_modified = conditional.not_modified(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        
+        try:
+            granularity, start, end = _timeseries_window(request.query_params)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        exact = request.query_params.get('exact', '').lower() == 'true'
+        points = DonationRollup.series(org.id, granularity, start, end)
+        return conditional.set_validators(Response({
+            'organization': org.id,
+            'granularity': granularity,
+            'start': format_datetime(DonationRollup.truncate(start, granularity)),
+            'end': format_datetime(end),
+            'unique_donors': DonationRollup.unique_donors(
+                granularity, start, end, exact=exact, organization_id=org.id
+            ),
+            'unique_donors_exact': exact,
+            'results': TimeseriesPointSerializer(points, many=True).data
+        }), request, etag, last_modified)
+    
+    @action(detail=False, methods=['get'], url_path='timeseries', url_name='category-timeseries')
+    def category_timeseries(self, request):
+        """The timeseries summed over one category's organizations, still read from rollups only"""
+        category = request.query_params.get('category')
+        if category not in dict(Organization.CATEGORIES):
+            return Response(
+                {'error': f"category must be one of: {', '.join(dict(Organization.CATEGORIES))}"},
+                status=status.HTTP_400_BAD_REQUEST
             )
         
-        return queryset
+        # Moves with completions and with organization edits (e.g. a category change), like category stats
+        parts = (conditional.stats_version(),)
+        if 'end' not in request.query_params:
+            parts += (conditional.clock_window().isoformat(),)
+        etag = conditional.make_etag(request, *parts)
+        not_modified = conditional.not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        
+        try:
+            granularity, start, end = _timeseries_window(request.query_params)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        exact = request.query_params.get('exact', '').lower() == 'true'
+        points = DonationRollup.category_series(category, granularity, start, end)
+        return conditional.set_validators(Response({
+            'category': category,
+            'granularity': granularity,
+            'start': format_datetime(DonationRollup.truncate(start, granularity)),
+            'end': format_datetime(end),
+            'unique_donors': DonationRollup.unique_donors(
+                granularity, start, end, exact=exact, organization__category=category
+            ),
+            'unique_donors_exact': exact,
+            'results': TimeseriesPointSerializer(points, many=True).data
+        }), request, etag)
 
 
-class DonationViewSet(viewsets.ModelViewSet):
+class DonationViewSet(FastListMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = Donation.objects.all()
     pagination_class = StandardPagination
+    keyset_ordering = ('-created_at', '-id')
+    list_rows = DonationRows
     
     def get_serializer_class(self):
         if self.action == 'create':
             return DonationCreateSerializer
         return DonationSerializer
     
+    def list(self, request, *args, **kwargs):
+        etag = conditional.donation_etag(request)
+        not_modified = conditional.not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        return conditional.set_validators(super().list(request, *args, **kwargs), request, etag)
+    
+    def retrieve(self, request, *args, **kwargs):
+        etag = conditional.donation_etag(request)
+        not_modified = conditional.not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        return conditional.set_validators(super().retrieve(request, *args, **kwargs), request, etag)
+    
     def get_queryset(self):
-        queryset = Donation.objects.all()
+        queryset = Donation.objects.select_related('organization')
         
-        org_id = self.request.query_params.get('organization', None)
-        if org_id:
-            queryset = queryset.filter(organization_id=org_id)
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.defer(
+                'organization__long_description', 'organization__description', 'organization__donor_sketch'
+            )
         
-        donor_wallet = self.request.query_params.get('donor_wallet', None)
-        if donor_wallet:
-            queryset = queryset.filter(donor_wallet__iexact=donor_wallet)
+        return filter_donations(queryset, self.request.query_params)
+    
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
+    def bulk(self, request):
+        """
+        Ingest donations from a JSON array, NDJSON or CSV body.
+
+        Staff only: completed rows are applied to the totals as given, without
+        the receipt check that complete and complete/batch make.
+        """
+        content_type = request.content_type.split(';')[0].strip()
         
-        donation_status = self.request.query_params.get('status', None)
-        if donation_status:
-            queryset = queryset.filter(status=donation_status)
+        if content_type in ('application/x-ndjson', 'application/jsonl'):
+            rows = ingest.iter_ndjson(request.stream or [])
+        elif content_type == 'text/csv':
+            rows = ingest.iter_csv(request.stream or [])
+        elif isinstance(request.data, list):
+            rows = ingest.iter_records(request.data)
+        else:
+            return Response(
+                {'error': 'Expected a JSON array, NDJSON or CSV body'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        return queryset
+        result = ingest.ingest_donations(rows)
+        return Response(result, status=status.HTTP_201_CREATED if result['created'] else status.HTTP_400_BAD_REQUEST)
     
     @action(detail=False, methods=['post'])
     def complete(self, request):
@@ -89,18 +360,149 @@ class DonationViewSet(viewsets.ModelViewSet):
                 {'error': 'donation_id and transaction_hash are required'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        if not str(donation_id).isdigit():
+            return Response({'error': 'Invalid donation_id'}, status=status.HTTP_400_BAD_REQUEST)
+        if not blockchain_utils.validate_tx_hash(tx_hash):
+            return Response({'error': 'Invalid transaction hash'}, status=status.HTTP_400_BAD_REQUEST)
+        tx_hash = blockchain_utils.format_tx_hash(tx_hash)
         
         try:
-            donation = Donation.objects.get(id=donation_id)
-            donation.complete(tx_hash)
-            
-            serializer = DonationSerializer(donation)
-            return Response(serializer.data)
+            donation = Donation.objects.select_related('organization').get(id=donation_id)
         except Donation.DoesNotExist:
             return Response(
                 {'error': 'Donation not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        
+        # A retry of a completion that already went through gets the same answer without another RPC or lock
+        if donation.status == 'completed' and donation.transaction_hash == tx_hash:
+            return Response(DonationSerializer(donation).data)
+        
+        verifier = get_receipt_verifier()
+        if verifier is not None:
+            try:
+                outcome = verifier.verify({tx_hash: verifier.expected_transfer(donation)})[tx_hash]
+            except RPCError as exc:
+                return Response(
+                    {'error': f'Could not verify transaction: {exc}'},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE
+                )
+            if outcome != CONFIRMED:
+                return Response({'error': MESSAGES[outcome]}, status=status.HTTP_409_CONFLICT)
+        
+        try:
+            donation.complete(tx_hash)
+        except DonationCompletionError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_409_CONFLICT)
+        
+        serializer = DonationSerializer(donation)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['post'], url_path='complete/batch')
+    def complete_batch(self, request):
+        items = request.data.get('items') if isinstance(request.data, dict) else request.data
+        
+        if not isinstance(items, list) or not items:
+            return Response(
+                {'error': 'items must be a non-empty list of {donation_id, transaction_hash}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > MAX_BATCH_COMPLETIONS:
+            return Response(
+                {'error': f'At most {MAX_BATCH_COMPLETIONS} items per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        results = [None] * len(items)
+        pending = []
+        for index, item in enumerate(items):
+            donation_id = item.get('donation_id') if isinstance(item, dict) else None
+            tx_hash = item.get('transaction_hash') if isinstance(item, dict) else None
+            
+            if not donation_id or not tx_hash:
+                results[index] = _item_error(donation_id, tx_hash, 'donation_id and transaction_hash are required')
+            elif not str(donation_id).isdigit():
+                results[index] = _item_error(donation_id, tx_hash, 'Invalid donation_id')
+            elif not blockchain_utils.validate_tx_hash(tx_hash):
+                results[index] = _item_error(donation_id, tx_hash, 'Invalid transaction hash')
+            else:
+                pending.append((index, (int(donation_id), blockchain_utils.format_tx_hash(tx_hash))))
+        
+        # The same hash twice in one request can only complete one donation
+        seen_hashes = set()
+        unique = []
+        for index, (donation_id, tx_hash) in pending:
+            if tx_hash in seen_hashes:
+                results[index] = _item_error(donation_id, tx_hash, 'Duplicate transaction hash in request')
+            else:
+                seen_hashes.add(tx_hash)
+                unique.append((index, (donation_id, tx_hash)))
+        
+        verifier = get_receipt_verifier()
+        if verifier is not None and unique:
+            # Unknown ids skip the RPC and are reported by complete_batch
+            donations = Donation.objects.select_related('organization').only(
+                'id', 'donor_wallet', 'amount', 'organization__wallet_address'
+            ).in_bulk([donation_id for _, (donation_id, _) in unique])
+            expected = {
+                tx_hash: verifier.expected_transfer(donations[donation_id])
+                for _, (donation_id, tx_hash) in unique if donation_id in donations
+            }
+            try:
+                outcomes = verifier.verify(expected)
+            except RPCError as exc:
+                return Response(
+                    {'error': f'Could not verify transactions: {exc}'},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE
+                )
+            verified = []
+            for index, (donation_id, tx_hash) in unique:
+                outcome = outcomes.get(tx_hash, CONFIRMED)
+                if outcome == CONFIRMED:
+                    verified.append((index, (donation_id, tx_hash)))
+                else:
+                    results[index] = _item_error(donation_id, tx_hash, MESSAGES[outcome])
+            unique = verified
+        
+        if unique:
+            batch_results = Donation.complete_batch([pair for _, pair in unique])
+            for (index, _), result in zip(unique, batch_results):
+                results[index] = result
+        
+        return Response({
+            'completed': sum(1 for result in results if result['status'] == 'completed'),
+            'results': results
+        })
+
+
+@require_GET
+def export_donations(request):
+    """
+    Stream donations as CSV (default) or NDJSON (?output=ndjson).
+
+    Takes the donation list filters plus start/end (ISO dates or datetimes,
+    end exclusive) on created_at, or on completed_at with ?date_field=completed_at.
+    A plain Django view so the body is never buffered by DRF's renderers.
+    """
+    params = request.GET
+    output = params.get('output', 'csv')
+    if output not in export.FORMATS:
+        return JsonResponse({'error': f"output must be one of: {', '.join(export.FORMATS)}"}, status=400)
+    
+    date_field = params.get('date_field', 'created_at')
+    if date_field not in ('created_at', 'completed_at'):
+        return JsonResponse({'error': 'date_field must be created_at or completed_at'}, status=400)
+    
+    queryset = filter_donations(Donation.objects.all(), params)
+    try:
+        if 'start' in params:
+            queryset = queryset.filter(**{f'{date_field}__gte': _parse_bound(params['start'])})
+        if 'end' in params:
+            queryset = queryset.filter(**{f'{date_field}__lt': _parse_bound(params['end'])})
+    except ValueError:
+        return JsonResponse({'error': 'start and end must be ISO 8601 dates or datetimes'}, status=400)
+    
+    return export.stream_donations(queryset, output, asynchronous=isinstance(request, ASGIRequest))
 
 
 @api_view(['POST'])
@@ -143,44 +545,171 @@ def validate_transaction(request):
     })
 
 
-@api_view(['GET'])
-def get_donation_stats(request):
-    completed_donations = Donation.objects.filter(status='completed')
-    
-    total_amount = completed_donations.aggregate(
-        total=Sum('amount')
-    )['total'] or 0
+@api_view(['POST'])
+def validate_wallets(request):
+    addresses = request.data.get('addresses')
+    # JSON true or a string flag; bool('false') would count as set
+    checksum = str(request.data.get('checksum', '')).lower() in ('1', 'true', 'yes')
     
-    total_usd = completed_donations.aggregate(
-        total=Sum('amount_usd')
-    )['total'] or 0
+    if not isinstance(addresses, list) or not addresses:
+        return Response(
+            {'error': 'addresses must be a non-empty list'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(addresses) > MAX_BATCH_VALIDATIONS:
+        return Response(
+            {'error': f'At most {MAX_BATCH_VALIDATIONS} addresses per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if checksum and keccak is None:
+        return Response(
+            {'error': 'Checksum verification is not available on this server'},
+            status=status.HTTP_501_NOT_IMPLEMENTED
+        )
     
-    unique_donors = completed_donations.values('donor_wallet').distinct().count()
-    total_donations = completed_donations.count()
+    results = []
+    for address, is_valid in zip(addresses, blockchain_utils.validate_eth_addresses(addresses)):
+        result = {
+            'address': address,
+            'valid': is_valid,
+            'formatted': blockchain_utils.format_address(address) if is_valid else None
+        }
+        if checksum:
+            result['checksum_valid'] = is_valid and blockchain_utils.validate_checksum(address)
+            result['checksummed'] = blockchain_utils.to_checksum_address(address) if is_valid else None
+        results.append(result)
     
     return Response({
-        'total_amount_sbc': float(total_amount),
-        'total_amount_usd': float(total_usd),
-        'total_donations': total_donations,
-        'unique_donors': unique_donors,
-        'organizations_count': Organization.objects.count()
+        'valid_count': sum(1 for result in results if result['valid']),
+        'results': results
     })
 
 
-@api_view(['GET'])
-def health_check(request):
-    """Health check endpoint"""
-    from django.db import connection
+@api_view(['POST'])
+def validate_transactions(request):
+    tx_hashes = request.data.get('transaction_hashes')
     
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1")
-        db_connected = True
-    except Exception:
-        db_connected = False
+    if not isinstance(tx_hashes, list) or not tx_hashes:
+        return Response(
+            {'error': 'transaction_hashes must be a non-empty list'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(tx_hashes) > MAX_BATCH_VALIDATIONS:
+        return Response(
+            {'error': f'At most {MAX_BATCH_VALIDATIONS} transaction hashes per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    results = [
+        {
+            'transaction_hash': tx_hash,
+            'valid': is_valid,
+            'formatted': blockchain_utils.format_tx_hash(tx_hash) if is_valid else None
+        }
+        for tx_hash, is_valid in zip(tx_hashes, blockchain_utils.validate_tx_hashes(tx_hashes))
+    ]
     
     return Response({
-        'status': 'healthy' if db_connected else 'unhealthy',
-        'database_connected': db_connected,
-        'version': '1.0.0'
+        'valid_count': sum(1 for result in results if result['valid']),
+        'results': results
     })
+
+
+def stats_validators(stats):
+    return quote_etag(f'stats-{stats.version}'), stats.updated_at
+
+
+def category_stats_payload(category, exact=False):
+    """Totals for one category from organization columns, daily rollups and merged donor sketches"""
+    organizations = Organization.objects.filter(category=category)
+    rollups = DonationRollup.objects.filter(granularity='day', organization__category=category).aggregate(
+        amount_usd=Sum('amount_usd'),
+        donations=Sum('donation_count')
+    )
+    return {
+        'category': category,
+        'total_amount_sbc': float(organizations.aggregate(total=Sum('raised_amount'))['total'] or 0),
+        'total_amount_usd': float(rollups['amount_usd'] or 0),
+        'total_donations': rollups['donations'] or 0,
+        'unique_donors': Organization.unique_donors(organizations, exact=exact),
+        'unique_donors_exact': exact,
+        'organizations_count': organizations.count()
+    }
+
+
+def donation_stats_validators(request, stats, category=None):
+    """(etag, last_modified) for /stats/, with or without ?category="""
+    if category:
+        # Category totals move with completions and with organization edits (e.g. a category change)
+        return conditional.make_etag(request, stats.version), None
+    return stats_validators(stats)
+
+
+@api_view(['GET'])
+def get_donation_stats(request):
+    category = request.query_params.get('category')
+    stats = GlobalStats.load()
+    etag, last_modified = donation_stats_validators(request, stats, category)
+    
+    not_modified = conditional.not_modified(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    
+    if category:
+        exact = request.query_params.get('exact', '').lower() == 'true'
+        return conditional.set_validators(Response(category_stats_payload(category, exact=exact)), request, etag)
+    return conditional.set_validators(Response(stats_payload(stats)), request, etag, last_modified)
+
+
+def health_payload(report):
+    """Original /health/ shape, now answered from the cached readiness report"""
+    return {
+        'status': 'healthy' if report['ready'] else 'unhealthy',
+        'database_connected': report['checks']['database']['status'] == 'ok',
+        'checks': report['checks'],
+        'version': API_VERSION
+    }
+
+
+def _no_store(response):
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+@api_view(['GET'])
+def health_check(request):
+    """Health check endpoint"""
+    report, _ = health.readiness()
+    return _no_store(Response(health_payload(report)))
+
+
+@require_GET
+def liveness(request):
+    """The process is up and serving; touches no dependencies"""
+    return _no_store(JsonResponse({'status': 'alive', 'version': API_VERSION}))
+
+
+@require_GET
+def readiness(request):
+    """
+    Database, cache and (when receipts are verified) chain RPC status with
+    per-dependency latency; 503 when any is down. Probes are cached for
+    HEALTH_CACHE_TTL seconds, see api.health.
+    """
+    report, age = health.readiness()
+    return _no_store(JsonResponse(
+        {
+            'status': 'ready' if report['ready'] else 'not_ready',
+            'checked_at': report['checked_at'],
+            'age_seconds': round(age, 3),
+            'checks': report['checks'],
+            'version': API_VERSION
+        },
+        status=200 if report['ready'] else 503
+    ))
+
+
+@require_GET
+def metrics_view(request):
+    """Per-route request metrics in Prometheus text format"""
+    return HttpResponse(metrics.registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,175 @@
+import itertools
+import time
+from collections import defaultdict
+from decimal import Decimal
+import requests
+from django.db import transaction
+from django.utils import timezone
+from donations.models import Donation
+from organizations.models import Organization
+from .models import IndexerCheckpoint
+from .verifier import TRANSFER_TOPIC, RPCError, address_topic, topic_address
+from .web3_client import blockchain_utils
+
+
+class JsonRpcClient:
+    """Minimal blocking JSON-RPC client over a pooled requests session"""
+
+    def __init__(self, url, timeout=10.0):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self._ids = itertools.count(1)
+
+    def call(self, method, *params):
+        try:
+            response = self.session.post(self.url, json={
+                'jsonrpc': '2.0', 'id': next(self._ids), 'method': method, 'params': list(params)
+            }, timeout=self.timeout)
+            response.raise_for_status()
+            reply = response.json()
+        except (requests.RequestException, ValueError) as exc:
+            raise RPCError(str(exc))
+
+        if reply.get('error'):
+            raise RPCError(reply['error'].get('message', str(reply['error'])))
+        return reply.get('result')
+
+
+class TransferIndexer:
+    """
+    Completes pending donations from ERC-20 Transfer logs sent to organization wallets.
+
+    Blocks are scanned with eth_getLogs in ranges that halve when the node
+    rejects a query (too many results, range too wide) and double while
+    results stay small. Only blocks at least reorg_depth behind the head are
+    indexed, so a processed range is never rewritten by a reorg, and the last
+    processed block is persisted in IndexerCheckpoint after every range.
+    """
+
+    def __init__(self, client, token_address, decimals=18, reorg_depth=12,
+                 initial_span=500, max_span=5000, target_logs=1000, max_topic_addresses=500,
+                 name='erc20-transfers'):
+        self.client = client
+        self.token_address = token_address.lower()
+        self.unit = Decimal(10) ** decimals
+        self.reorg_depth = reorg_depth
+        self.span = initial_span
+        self.max_span = max_span
+        self.target_logs = target_logs
+        self.max_topic_addresses = max_topic_addresses
+        self.name = name
+        self.stats = {'blocks': 0, 'logs': 0, 'completed': 0, 'seconds': 0.0}
+
+    def safe_head(self):
+        return int(self.client.call('eth_blockNumber'), 16) - self.reorg_depth
+
+    def checkpoint(self, start_block=None):
+        checkpoint = IndexerCheckpoint.objects.filter(name=self.name).first()
+        if checkpoint is None:
+            block = start_block - 1 if start_block is not None else self.safe_head()
+            checkpoint = IndexerCheckpoint.objects.create(name=self.name, block_number=block)
+        return checkpoint
+
+    def org_wallets(self):
+        wallets = {}
+        for org_id, wallet in Organization.objects.values_list('id', 'wallet_address'):
+            if blockchain_utils.validate_eth_address(wallet):
+                wallets[blockchain_utils.format_address(wallet)] = org_id
+        return wallets
+
+    def get_logs(self, from_block, to_block, wallets):
+        addresses = sorted(wallets)
+        logs = []
+        for index in range(0, len(addresses), self.max_topic_addresses):
+            chunk = addresses[index:index + self.max_topic_addresses]
+            logs.extend(self.client.call('eth_getLogs', {
+                'fromBlock': hex(from_block),
+                'toBlock': hex(to_block),
+                'address': self.token_address,
+                'topics': [TRANSFER_TOPIC, None, [address_topic(address) for address in chunk]],
+            }) or [])
+        return logs
+
+    def run_once(self, start_block=None):
+        """Index from the checkpoint up to the current safe head; returns blocks processed"""
+        checkpoint = self.checkpoint(start_block)
+        safe_head = self.safe_head()
+        wallets = self.org_wallets()
+        processed = 0
+
+        while checkpoint.block_number < safe_head:
+            from_block = checkpoint.block_number + 1
+            to_block = min(from_block + self.span - 1, safe_head)
+            started = time.perf_counter()
+
+            try:
+                logs = self.get_logs(from_block, to_block, wallets) if wallets else []
+            except RPCError:
+                if self.span == 1:
+                    raise
+                self.span = max(1, self.span // 2)
+                continue
+
+            # Completions and the checkpoint commit together, so a crash never skips or replays a range
+            with transaction.atomic():
+                completed = self.process(logs, wallets)
+                checkpoint.block_number = to_block
+                checkpoint.updated_at = timezone.now()
+                checkpoint.save(update_fields=['block_number', 'updated_at'])
+
+            blocks = to_block - from_block + 1
+            processed += blocks
+            self.stats['blocks'] += blocks
+            self.stats['logs'] += len(logs)
+            self.stats['completed'] += completed
+            self.stats['seconds'] += time.perf_counter() - started
+
+            if len(logs) < self.target_logs // 2:
+                self.span = min(self.span * 2, self.max_span)
+
+        return processed
+
+    def process(self, logs, wallets):
+        """Match transfers to pending donations (oldest first) and complete them in one batch"""
+        transfers = []
+        for log in logs:
+            if log.get('removed') or len(log.get('topics', [])) < 3:
+                continue
+            org_id = wallets.get(topic_address(log['topics'][2]))
+            if org_id is None:
+                continue
+            transfers.append((org_id, topic_address(log['topics'][1]), int(log['data'], 16), log['transactionHash'].lower()))
+
+        if not transfers:
+            return 0
+
+        pending = Donation.objects.filter(
+            organization_id__in={org_id for org_id, _, _, _ in transfers},
+            donor_wallet__in={sender for _, sender, _, _ in transfers},
+            status__in=['pending', 'processing'],
+        ).order_by('created_at', 'id')
+
+        candidates = defaultdict(list)
+        for donation in pending:
+            units = int(donation.amount * self.unit)
+            candidates[(donation.organization_id, donation.donor_wallet, units)].append(donation.id)
+
+        known_hashes = set(Donation.objects.filter(
+            transaction_hash__in=[tx_hash for _, _, _, tx_hash in transfers]
+        ).values_list('transaction_hash', flat=True))
+
+        pairs = []
+        for org_id, sender, value, tx_hash in transfers:
+            if tx_hash in known_hashes:
+                continue
+            matches = candidates.get((org_id, sender, value))
+            if matches:
+                pairs.append((matches.pop(0), tx_hash))
+                known_hashes.add(tx_hash)
+
+        if not pairs:
+            return 0
+
+        results = Donation.complete_batch(pairs)
+        return sum(1 for result in results if result['status'] == 'completed')
@@ -0,0 +1,11 @@
+from django.db import models
+from django.utils import timezone
+
+class IndexerCheckpoint(models.Model):
+    """Last block a chain indexer has fully processed"""
+    name = models.CharField(max_length=100, unique=True)
+    block_number = models.BigIntegerField()
+    updated_at = models.DateTimeField(default=timezone.now)
+    
+    def __str__(self):
+        return f"{self.name} @ {self.block_number}"
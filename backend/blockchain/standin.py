@@ -0,0 +1,122 @@
+import json
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from .verifier import TRANSFER_TOPIC, address_topic
+
+
+class StandInNode:
+    """
+    Local JSON-RPC stand-in for an Ethereum node, answering eth_blockNumber,
+    eth_getTransactionReceipt and eth_getLogs (single calls and batches)
+    from memory. Used by the blockchain tests and benchmark_indexer.
+
+    eth_getLogs filters by address and topics like a real node, and fails
+    with a too-many-results error when a query matches more than max_logs.
+    """
+
+    def __init__(self, token):
+        self.token = token.lower()
+        self.head = 100
+        self.receipts = {}
+        self.logs = defaultdict(list)  # block number -> logs
+        self.max_logs = None
+        self.delay = 0.0
+        self.requests = 0
+        self.log_queries = []
+        self._lock = threading.Lock()
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with node._lock:
+                    node.requests += 1
+                time.sleep(node.delay)
+                reply = [node.reply(call) for call in body] if isinstance(body, list) else node.reply(body)
+                data = json.dumps(reply).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except BrokenPipeError:
+                    # The client gave up waiting (timeout tests)
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def reply(self, call):
+        method, params = call['method'], call.get('params', [])
+        if method == 'eth_blockNumber':
+            result = hex(self.head)
+        elif method == 'eth_getLogs':
+            result = self.get_logs(params[0])
+            if self.max_logs is not None and len(result) > self.max_logs:
+                return {'jsonrpc': '2.0', 'id': call['id'], 'error': {
+                    'code': -32005, 'message': f'query returned more than {self.max_logs} results',
+                }}
+        else:
+            result = self.receipts.get(params[0])
+        return {'jsonrpc': '2.0', 'id': call['id'], 'result': result}
+
+    def get_logs(self, query):
+        from_block, to_block = int(query['fromBlock'], 16), int(query['toBlock'], 16)
+        with self._lock:
+            self.log_queries.append((from_block, to_block))
+        addresses = query.get('address')
+        if isinstance(addresses, str):
+            addresses = [addresses]
+        addresses = {address.lower() for address in addresses} if addresses else None
+
+        matched = []
+        for block in range(from_block, min(to_block, self.head) + 1):
+            for log in self.logs.get(block, ()):
+                if addresses is not None and log['address'] not in addresses:
+                    continue
+                if all(self._topic_matches(wanted, log['topics'], index)
+                       for index, wanted in enumerate(query.get('topics', []))):
+                    matched.append(log)
+        return matched
+
+    @staticmethod
+    def _topic_matches(wanted, topics, index):
+        if wanted is None:
+            return True
+        if index >= len(topics):
+            return False
+        return topics[index] in wanted if isinstance(wanted, list) else topics[index] == wanted
+
+    def add_transfer(self, tx_hash, sender, recipient, value, block, token=None):
+        """A Transfer log in block, as eth_getLogs returns it"""
+        self.logs[block].append({
+            'address': (token or self.token).lower(),
+            'topics': [TRANSFER_TOPIC, address_topic(sender), address_topic(recipient)],
+            'data': '0x' + format(value, '064x'),
+            'blockNumber': hex(block),
+            'transactionHash': tx_hash,
+            'removed': False,
+        })
+
+    def add_receipt(self, tx_hash, transfers=(), block=90, status='0x1', token=None):
+        self.receipts[tx_hash] = {
+            'transactionHash': tx_hash,
+            'blockNumber': hex(block),
+            'status': status,
+            'logs': [
+                {'address': token or self.token, 'topics': [TRANSFER_TOPIC, address_topic(sender), address_topic(recipient)],
+                 'data': '0x' + format(value, '064x')}
+                for sender, recipient, value in transfers
+            ],
+        }
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
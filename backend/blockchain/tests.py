@@ -0,0 +1,282 @@
+import asyncio
+import threading
+import time
+from decimal import Decimal
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from donations.models import Donation
+from organizations.models import Organization
+from .indexer import JsonRpcClient, TransferIndexer
+from .models import IndexerCheckpoint
+from .standin import StandInNode
+from .verifier import (
+    CONFIRMED, MISMATCH, PENDING, REVERTED, ExpectedTransfer, ReceiptVerifier, RPCError, reset_receipt_verifier,
+)
+
+TOKEN = '0x' + 'c' * 40
+DONOR = '0x' + 'd' * 40
+ORG_WALLET = '0x' + 'e' * 40
+
+
+def tx(index):
+    return '0x%064x' % index
+
+
+class ReceiptVerifierTests(TestCase):
+    def setUp(self):
+        self.node = StandInNode(TOKEN)
+        self.verifier = ReceiptVerifier(self.node.url, TOKEN, timeout=1.0, min_confirmations=3)
+        self.expected = ExpectedTransfer(DONOR, ORG_WALLET, 5 * 10 ** 18)
+
+    def tearDown(self):
+        self.verifier.close()
+        self.node.close()
+
+    def verify(self, tx_hash, expected=None):
+        return self.verifier.verify({tx_hash: expected or self.expected})[tx_hash]
+
+    def test_matching_transfer_is_confirmed(self):
+        # Alongside an unrelated transfer in the same transaction
+        self.node.add_receipt(tx(1), [(DONOR, '0x' + 'f' * 40, 1), (DONOR, ORG_WALLET, 5 * 10 ** 18)])
+        self.assertEqual(self.verify(tx(1)), CONFIRMED)
+
+    def test_any_other_confirmed_transaction_is_rejected(self):
+        self.node.add_receipt(tx(1), [(DONOR, ORG_WALLET, 4 * 10 ** 18)])
+        self.node.add_receipt(tx(2), [('0x' + 'a' * 40, ORG_WALLET, 5 * 10 ** 18)])
+        self.node.add_receipt(tx(3), [(DONOR, '0x' + 'a' * 40, 5 * 10 ** 18)])
+        self.node.add_receipt(tx(4), [(DONOR, ORG_WALLET, 5 * 10 ** 18)], token='0x' + 'b' * 40)
+        self.node.add_receipt(tx(5))
+        for index in range(1, 6):
+            self.assertEqual(self.verify(tx(index)), MISMATCH, index)
+
+    def test_reverted_and_unconfirmed(self):
+        self.node.add_receipt(tx(1), [(DONOR, ORG_WALLET, 5 * 10 ** 18)], status='0x0')
+        self.node.add_receipt(tx(2), [(DONOR, ORG_WALLET, 5 * 10 ** 18)], block=99)
+        self.assertEqual(self.verify(tx(1)), REVERTED)
+        self.assertEqual(self.verify(tx(2)), PENDING)
+        self.assertEqual(self.verify(tx(3)), PENDING)
+
+    def test_concurrent_lookups_share_a_batch(self):
+        for index in range(40):
+            self.node.add_receipt(tx(index), [(DONOR, ORG_WALLET, 5 * 10 ** 18)])
+        results = {}
+        start = threading.Barrier(40)
+
+        def lookup(index):
+            start.wait()
+            results[index] = self.verify(tx(index))
+
+        threads = [threading.Thread(target=lookup, args=(index,)) for index in range(40)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(set(results.values()), {CONFIRMED})
+        self.assertLessEqual(self.node.requests, 3)
+
+    def test_confirmed_receipts_are_cached_in_a_bounded_lru(self):
+        self.verifier.cache_size = 2
+        for index in range(3):
+            self.node.add_receipt(tx(index), [(DONOR, ORG_WALLET, 5 * 10 ** 18)])
+            self.verify(tx(index))
+        requests = self.node.requests
+        # The cached receipt is still checked against each caller's expectation
+        self.assertEqual(self.verify(tx(2), ExpectedTransfer(DONOR, ORG_WALLET, 1)), MISMATCH)
+        self.assertEqual(self.verify(tx(1)), CONFIRMED)
+        self.assertEqual(self.node.requests, requests)
+        self.assertEqual(list(self.verifier._confirmed), [tx(2), tx(1)])
+        self.verify(tx(0))
+        self.assertEqual(self.node.requests, requests + 1)
+
+    def test_slow_node_is_an_rpc_error(self):
+        self.node.delay = 0.5
+        self.verifier.timeout = 0.1
+        with self.assertRaises(RPCError):
+            self.verify(tx(1))
+
+    def test_stuck_lookup_is_an_rpc_error(self):
+        async def stuck(expected):
+            await asyncio.sleep(10)
+
+        self.verifier.timeout = 0.1
+        self.verifier._verify = stuck
+        with self.assertRaises(RPCError):
+            self.verify(tx(1))
+
+    def test_malformed_reply_fails_at_once(self):
+        self.node.receipts[tx(1)] = {'transactionHash': tx(1), 'blockNumber': 'not hex', 'status': '0x1', 'logs': []}
+        self.verifier.timeout = 5.0
+        started = time.monotonic()
+        with self.assertRaises(RPCError):
+            self.verify(tx(1))
+        self.assertLess(time.monotonic() - started, 1.0)
+
+
+class TransferIndexerTests(TestCase):
+    def setUp(self):
+        self.node = StandInNode(TOKEN)
+        self.node.head = 1000
+        self.org = Organization.objects.create(
+            name='Org', category='water', location='Nairobi', description='Clean water', wallet_address=ORG_WALLET
+        )
+        self.other = Organization.objects.create(
+            name='Other', category='water', location='Lima', description='Wells', wallet_address='0x' + 'a' * 40
+        )
+        self.client = JsonRpcClient(self.node.url, timeout=1.0)
+
+    def tearDown(self):
+        self.node.close()
+
+    def indexer(self, **options):
+        """A fresh indexer each call, as after a restart: all state beyond the span is in the checkpoint"""
+        return TransferIndexer(self.client, TOKEN, reorg_depth=12, initial_span=100, **options)
+
+    def donate(self, amount='2.5', org=None, donor=DONOR):
+        return Donation.objects.create(organization=org or self.org, donor_wallet=donor, amount=Decimal(amount))
+
+    def assertCompleted(self, donation, tx_hash):
+        donation.refresh_from_db()
+        self.assertEqual((donation.status, donation.transaction_hash), ('completed', tx_hash))
+
+    def assertPending(self, donation):
+        donation.refresh_from_db()
+        self.assertEqual(donation.status, 'pending')
+
+    def test_transfers_match_token_recipient_sender_and_amount(self):
+        first, second, small, other_org = self.donate(), self.donate(), self.donate('1'), self.donate(org=self.other)
+        units = 25 * 10 ** 17
+        self.node.add_transfer(tx(1), DONOR, ORG_WALLET, units, block=10)
+        self.node.add_transfer(tx(2), DONOR, ORG_WALLET, units, block=11, token='0x' + 'b' * 40)
+        self.node.add_transfer(tx(3), DONOR, '0x' + 'f' * 40, units, block=12)
+        self.node.add_transfer(tx(4), DONOR, ORG_WALLET, 3 * 10 ** 18, block=13)
+        self.node.add_transfer(tx(5), '0x' + 'b' * 40, ORG_WALLET, units, block=14)
+        self.node.add_transfer(tx(6), DONOR, ORG_WALLET, units, block=15)
+        self.node.logs[15][-1]['removed'] = True
+        self.node.add_transfer(tx(7), DONOR, self.other.wallet_address, units, block=16)
+
+        # One address per eth_getLogs, so each range is queried once per organization wallet
+        indexer = self.indexer(max_topic_addresses=1)
+        self.assertEqual(indexer.run_once(start_block=1), 988)
+        self.assertEqual(indexer.stats['completed'], 2)
+        # The oldest matching donation takes the transfer; the rest wait for theirs
+        self.assertCompleted(first, tx(1))
+        self.assertCompleted(other_org, tx(7))
+        self.assertPending(second)
+        self.assertPending(small)
+        self.assertEqual(len(self.node.log_queries), 2 * len(set(self.node.log_queries)))
+
+    def test_resumes_from_the_checkpoint(self):
+        first, second = self.donate(), self.donate()
+        self.assertEqual(self.indexer().run_once(start_block=1), 988)
+        self.assertEqual(IndexerCheckpoint.objects.get().block_number, 988)
+
+        # Below the checkpoint: already scanned, never revisited
+        self.node.add_transfer(tx(1), DONOR, ORG_WALLET, 25 * 10 ** 17, block=500)
+        self.node.add_transfer(tx(2), DONOR, ORG_WALLET, 25 * 10 ** 17, block=1010)
+        self.node.head = 1100
+        self.node.log_queries.clear()
+
+        self.assertEqual(self.indexer().run_once(start_block=1), 100)
+        self.assertEqual(self.node.log_queries[0][0], 989)
+        self.assertEqual(IndexerCheckpoint.objects.get().block_number, 1088)
+        self.assertCompleted(first, tx(2))
+        self.assertPending(second)
+
+    def test_reorg_window_is_scanned_once_the_head_passes_it(self):
+        donation = self.donate()
+        self.node.add_transfer(tx(1), DONOR, ORG_WALLET, 25 * 10 ** 17, block=995)
+        self.indexer().run_once(start_block=1)
+        self.assertPending(donation)
+        self.assertTrue(all(to_block <= 988 for _, to_block in self.node.log_queries))
+
+        # Reorged away before it was safe: only the replacement transaction counts
+        self.node.logs[995] = []
+        self.node.add_transfer(tx(2), DONOR, ORG_WALLET, 25 * 10 ** 17, block=996)
+        self.node.head = 1020
+        self.indexer().run_once()
+        self.assertCompleted(donation, tx(2))
+
+    def test_span_halves_on_too_many_results(self):
+        donations = [self.donate() for _ in range(10)]
+        for index in range(10):
+            self.node.add_transfer(tx(index), DONOR, ORG_WALLET, 25 * 10 ** 17, block=index + 1)
+        self.node.max_logs = 3
+
+        indexer = self.indexer()
+        indexer.run_once(start_block=1)
+        spans = [to_block - from_block + 1 for from_block, to_block in self.node.log_queries]
+        self.assertEqual(spans[:6], [100, 50, 25, 12, 6, 3])
+        for index, donation in enumerate(donations):
+            self.assertCompleted(donation, tx(index))
+        self.assertEqual(IndexerCheckpoint.objects.get().block_number, 988)
+
+    def test_single_block_over_the_limit_is_an_rpc_error(self):
+        for index in range(3):
+            self.node.add_transfer(tx(index), DONOR, ORG_WALLET, 10 ** 18, block=5)
+        self.node.max_logs = 2
+        with self.assertRaises(RPCError):
+            self.indexer().run_once(start_block=1)
+        self.assertEqual(IndexerCheckpoint.objects.get().block_number, 4)
+
+
+class VerifiedCompletionTests(TestCase):
+    def setUp(self):
+        self.node = StandInNode(TOKEN)
+        self.settings = override_settings(
+            CHAIN_VERIFY_RECEIPTS=True, CHAIN_RPC_URL=self.node.url, CHAIN_TOKEN_ADDRESS=TOKEN,
+            CHAIN_TOKEN_DECIMALS=18, CHAIN_MIN_CONFIRMATIONS=1,
+        )
+        self.settings.enable()
+        reset_receipt_verifier()
+        org = Organization.objects.create(
+            name='Org', category='water', location='Nairobi', description='Clean water', wallet_address=ORG_WALLET
+        )
+        self.donations = [
+            Donation.objects.create(organization=org, donor_wallet=DONOR, amount=Decimal('2.5')) for _ in range(3)
+        ]
+        self.client = APIClient()
+
+    def tearDown(self):
+        reset_receipt_verifier()
+        self.settings.disable()
+        self.node.close()
+
+    def test_complete_requires_the_donation_transfer(self):
+        self.node.add_receipt(tx(1), [(DONOR, ORG_WALLET, 10 ** 18)])
+        self.node.add_receipt(tx(2), [(DONOR, ORG_WALLET, 25 * 10 ** 17)])
+        donation = self.donations[0]
+
+        response = self.client.post(
+            '/api/donations/complete/', {'donation_id': donation.pk, 'transaction_hash': tx(1)}, format='json'
+        )
+        self.assertEqual(response.status_code, 409)
+        donation.refresh_from_db()
+        self.assertEqual(donation.status, 'pending')
+
+        response = self.client.post(
+            '/api/donations/complete/', {'donation_id': donation.pk, 'transaction_hash': tx(2)}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        donation.refresh_from_db()
+        self.assertEqual(donation.status, 'completed')
+
+    def test_complete_batch_checks_each_item(self):
+        self.node.add_receipt(tx(1), [(DONOR, ORG_WALLET, 25 * 10 ** 17)])
+        self.node.add_receipt(tx(2), [(DONOR, '0x' + 'a' * 40, 25 * 10 ** 17)])
+        response = self.client.post('/api/donations/complete/batch/', {'items': [
+            {'donation_id': self.donations[0].pk, 'transaction_hash': tx(1)},
+            {'donation_id': self.donations[1].pk, 'transaction_hash': tx(2)},
+            {'donation_id': self.donations[2].pk, 'transaction_hash': tx(3)},
+            {'donation_id': 999999, 'transaction_hash': tx(4)},
+        ]}, format='json')
+        self.assertEqual(response.data['completed'], 1)
+        statuses = [result['status'] for result in response.data['results']]
+        self.assertEqual(statuses, ['completed', 'error', 'error', 'error'])
+        self.assertEqual(response.data['results'][3]['error'], 'Donation not found')
+
+    def test_unreachable_node_is_503(self):
+        self.node.close()
+        response = self.client.post(
+            '/api/donations/complete/', {'donation_id': self.donations[0].pk, 'transaction_hash': tx(1)}, format='json'
+        )
+        self.assertEqual(response.status_code, 503)
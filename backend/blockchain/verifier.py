@@ -0,0 +1,295 @@
+import asyncio
+import concurrent.futures
+import itertools
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from decimal import Decimal
+from django.conf import settings
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp ships with web3
+    aiohttp = None
+
+
+# keccak256('Transfer(address,address,uint256)')
+TRANSFER_TOPIC = '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
+
+# Verification outcomes
+CONFIRMED = 'confirmed'
+PENDING = 'pending'  # no receipt yet, or not enough confirmations
+REVERTED = 'reverted'
+MISMATCH = 'mismatch'  # confirmed, but it isn't the donation's transfer
+
+MESSAGES = {
+    PENDING: 'Transaction is not confirmed on chain',
+    REVERTED: 'Transaction failed on chain',
+    MISMATCH: 'Transaction does not transfer the donation amount from the donor wallet to the organization wallet',
+}
+
+# What a donation's transaction must contain: a token Transfer log with these (lowercase) addresses and base units
+ExpectedTransfer = namedtuple('ExpectedTransfer', ['sender', 'recipient', 'value'])
+
+
+class RPCError(Exception):
+    pass
+
+
+def topic_address(topic):
+    return '0x' + topic[-40:].lower()
+
+
+def address_topic(address):
+    return '0x' + address[2:].lower().rjust(64, '0')
+
+
+def decode_transfers(receipt, token_address):
+    """(sender, recipient, value) of every Transfer log the token contract emitted in a receipt"""
+    transfers = []
+    for log in receipt.get('logs') or ():
+        topics = log.get('topics') or []
+        if (log.get('address') or '').lower() != token_address or len(topics) < 3:
+            continue
+        if topics[0].lower() != TRANSFER_TOPIC:
+            continue
+        data = log.get('data') or '0x'
+        transfers.append((topic_address(topics[1]), topic_address(topics[2]), int(data, 16) if len(data) > 2 else 0))
+    return transfers
+
+
+class ReceiptVerifier:
+    """
+    Confirms that transactions are the donations they claim to be.
+
+    A hash is accepted only if its receipt succeeded, is min_confirmations
+    deep and holds a Transfer log from the configured token contract that
+    moves the expected value from the donor wallet to the organization
+    wallet. Any other confirmed transaction is a MISMATCH.
+
+    Lookups from concurrent callers are coalesced for batch_window seconds
+    and sent as one JSON-RPC batch (plus an eth_blockNumber for the
+    confirmation depth) over a pooled aiohttp session. The transfers of
+    confirmed receipts are kept in a bounded LRU with a TTL, so a block's
+    worth of completions costs one round trip.
+
+    The session and the batching run on a dedicated event loop thread, which
+    lets sync views (verify) and async views (averify) share one pool.
+    """
+
+    def __init__(self, rpc_url, token_address, decimals=18, timeout=5.0, cache_ttl=600, cache_size=10000,
+                 min_confirmations=1, batch_window=0.01, max_batch_size=100, pool_size=10):
+        self.rpc_url = rpc_url
+        self.token_address = token_address.lower()
+        self.unit = Decimal(10) ** decimals
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.min_confirmations = min_confirmations
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.pool_size = pool_size
+
+        # tx hash -> (expires, transfers); only touched on the loop thread
+        self._confirmed = OrderedDict()
+        self._ids = itertools.count(1)
+        self._loop = None
+        self._session = None
+        self._pending = {}
+        self._flush_handle = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._start_lock:
+            if self._loop is None:
+                if aiohttp is None:
+                    raise RPCError('Receipt verification requires aiohttp (installed with web3)')
+                self._loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=self._loop.run_forever, name='receipt-verifier', daemon=True)
+                thread.start()
+        return self._loop
+
+    def expected_transfer(self, donation):
+        """The transfer that completes donation (its organization must be loaded or loadable)"""
+        return ExpectedTransfer(
+            donation.donor_wallet.lower(),
+            donation.organization.wallet_address.lower(),
+            int(donation.amount * self.unit),
+        )
+
+    def verify(self, expected):
+        """Blocking: map each tx hash in {tx_hash: ExpectedTransfer} to CONFIRMED, PENDING, REVERTED or MISMATCH"""
+        future = asyncio.run_coroutine_threadsafe(self._verify(dict(expected)), self._ensure_loop())
+        try:
+            return future.result(self.timeout * 2)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise RPCError(f'No reply from the node within {self.timeout * 2:g}s')
+
+    async def averify(self, expected):
+        future = asyncio.run_coroutine_threadsafe(self._verify(dict(expected)), self._ensure_loop())
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout * 2)
+        except asyncio.TimeoutError:
+            raise RPCError(f'No reply from the node within {self.timeout * 2:g}s')
+
+    def close(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(self.timeout)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+        self._session = None
+
+    async def _shutdown(self):
+        """Cancel and wait out in-flight lookups and sends, so none is left pending when the loop stops"""
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._session is not None:
+            await self._session.close()
+
+    def _cached(self, tx_hash):
+        """Transfers of a confirmed receipt, or None"""
+        entry = self._confirmed.get(tx_hash)
+        if entry is None:
+            return None
+        expires, transfers = entry
+        if expires < time.monotonic():
+            del self._confirmed[tx_hash]
+            return None
+        self._confirmed.move_to_end(tx_hash)
+        return transfers
+
+    def _remember(self, tx_hash, transfers):
+        self._confirmed[tx_hash] = (time.monotonic() + self.cache_ttl, transfers)
+        self._confirmed.move_to_end(tx_hash)
+        while len(self._confirmed) > self.cache_size:
+            self._confirmed.popitem(last=False)
+
+    @staticmethod
+    def _match(outcome, expected):
+        if not isinstance(outcome, list):
+            return outcome
+        return CONFIRMED if tuple(expected) in outcome else MISMATCH
+
+    async def _verify(self, expected):
+        results = {}
+        waiting = []
+        for tx_hash in expected:
+            transfers = self._cached(tx_hash)
+            if transfers is not None:
+                results[tx_hash] = self._match(transfers, expected[tx_hash])
+                continue
+            future = self._pending.get(tx_hash)
+            if future is None:
+                future = self._loop.create_future()
+                self._pending[tx_hash] = future
+            waiting.append((tx_hash, future))
+
+        if waiting:
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = self._loop.call_later(self.batch_window, self._flush)
+            for tx_hash, future in waiting:
+                results[tx_hash] = self._match(await asyncio.shield(future), expected[tx_hash])
+        return results
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            self._loop.create_task(self._send(batch))
+
+    async def _session_get(self):
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    async def _send(self, batch):
+        head_id = next(self._ids)
+        ids = {}
+        payload = [{'jsonrpc': '2.0', 'id': head_id, 'method': 'eth_blockNumber', 'params': []}]
+        for tx_hash in batch:
+            request_id = next(self._ids)
+            ids[request_id] = tx_hash
+            payload.append({'jsonrpc': '2.0', 'id': request_id, 'method': 'eth_getTransactionReceipt', 'params': [tx_hash]})
+
+        try:
+            session = await self._session_get()
+            async with session.post(self.rpc_url, json=payload) as response:
+                response.raise_for_status()
+                replies = await response.json(content_type=None)
+            if not isinstance(replies, list):
+                raise RPCError(f'Unexpected JSON-RPC reply: {replies!r}')
+
+            # Parsed here so a malformed reply fails the callers now, not after their timeout
+            by_id = {reply.get('id'): reply for reply in replies}
+            head = by_id.get(head_id, {}).get('result')
+            head = int(head, 16) if head else None
+            outcomes = {
+                tx_hash: self._check(by_id.get(request_id, {}).get('result'), head)
+                for request_id, tx_hash in ids.items()
+            }
+        except Exception as exc:
+            error = exc if isinstance(exc, RPCError) else RPCError(str(exc) or exc.__class__.__name__)
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for tx_hash, outcome in outcomes.items():
+            if isinstance(outcome, list):
+                self._remember(tx_hash, outcome)
+            future = batch[tx_hash]
+            if not future.done():
+                future.set_result(outcome)
+
+    def _check(self, receipt, head):
+        """The receipt's token transfers once it is confirmed, else PENDING or REVERTED"""
+        if not receipt or not receipt.get('blockNumber'):
+            return PENDING
+        if receipt.get('status') != '0x1':
+            return REVERTED
+        if head is None or head - int(receipt['blockNumber'], 16) + 1 < self.min_confirmations:
+            return PENDING
+        return decode_transfers(receipt, self.token_address)
+
+
+_verifier = None
+_verifier_lock = threading.Lock()
+
+
+def get_receipt_verifier():
+    """Process-wide verifier configured from settings, or None when verification is disabled"""
+    global _verifier
+    if not getattr(settings, 'CHAIN_VERIFY_RECEIPTS', False):
+        return None
+    with _verifier_lock:
+        if _verifier is None:
+            _verifier = ReceiptVerifier(
+                settings.CHAIN_RPC_URL,
+                settings.CHAIN_TOKEN_ADDRESS,
+                decimals=settings.CHAIN_TOKEN_DECIMALS,
+                timeout=settings.CHAIN_RPC_TIMEOUT,
+                cache_ttl=settings.CHAIN_RECEIPT_CACHE_TTL,
+                cache_size=settings.CHAIN_RECEIPT_CACHE_SIZE,
+                min_confirmations=settings.CHAIN_MIN_CONFIRMATIONS,
+            )
+    return _verifier
+
+
+def reset_receipt_verifier():
+    """Close the process-wide verifier so the next call builds one from current settings"""
+    global _verifier
+    with _verifier_lock:
+        if _verifier is not None:
+            _verifier.close()
+        _verifier = None
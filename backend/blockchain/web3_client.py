@@ -1,57 +1,81 @@
+import re
+
+try:
+    from eth_utils import keccak
+except ImportError:  # eth-utils ships with web3; checksum verification is unavailable without it
+    keccak = None
+
+ADDRESS_RE = re.compile(r'(?:0[xX])?([0-9a-fA-F]{40})')
+TX_HASH_RE = re.compile(r'(?:0[xX])?([0-9a-fA-F]{64})')
+
 
 class BlockchainUtils:
     @staticmethod
     def validate_eth_address(address):
-        if not address:
-            return False
-        
-        addr = address.lower().replace('0x', '')
-        
-        if len(addr) != 40:
-            return False
-        
-        try:
-            int(addr, 16)
-            return True
-        except ValueError:
+        if not address or not isinstance(address, str):
             return False
-    
+        return ADDRESS_RE.fullmatch(address) is not None
+
     @staticmethod
     def validate_tx_hash(tx_hash):
-        if not tx_hash:
+        if not tx_hash or not isinstance(tx_hash, str):
             return False
-        
-        hash_str = tx_hash.lower().replace('0x', '')
-        
-        if len(hash_str) != 64:
+        return TX_HASH_RE.fullmatch(tx_hash) is not None
+
+    @staticmethod
+    def validate_eth_addresses(addresses):
+        match = ADDRESS_RE.fullmatch
+        return [isinstance(address, str) and match(address) is not None for address in addresses]
+
+    @staticmethod
+    def validate_tx_hashes(tx_hashes):
+        match = TX_HASH_RE.fullmatch
+        return [isinstance(tx_hash, str) and match(tx_hash) is not None for tx_hash in tx_hashes]
+
+    @staticmethod
+    def to_checksum_address(address):
+        """EIP-55 mixed-case form of a valid address"""
+        if keccak is None:
+            raise RuntimeError('EIP-55 checksums require eth-utils (installed with web3)')
+
+        hex_addr = ADDRESS_RE.fullmatch(address).group(1).lower()
+        digest = keccak(text=hex_addr).hex()
+        return '0x' + ''.join(
+            char.upper() if int(nibble, 16) >= 8 else char
+            for char, nibble in zip(hex_addr, digest)
+        )
+
+    @classmethod
+    def validate_checksum(cls, address):
+        """Valid if the address is all one case or its mixed case matches the EIP-55 checksum"""
+        if not cls.validate_eth_address(address):
             return False
-        
-        try:
-            int(hash_str, 16)
+
+        hex_addr = address[-40:]
+        if hex_addr.islower() or hex_addr.isupper() or hex_addr.isdigit():
             return True
-        except ValueError:
-            return False
-    
+        return cls.to_checksum_address(address)[2:] == hex_addr
+
     @staticmethod
     def format_address(address):
         if not address:
             return None
-        
+
         addr = address.lower()
         if not addr.startswith('0x'):
             addr = '0x' + addr
-        
+
         return addr
-    
+
     @staticmethod
     def format_tx_hash(tx_hash):
         if not tx_hash:
             return None
-        
+
         hash_str = tx_hash.lower()
         if not hash_str.startswith('0x'):
             hash_str = '0x' + hash_str
-        
+
         return hash_str
 
 
@@ -1,5 +1,7 @@
 from pathlib import Path
+import django
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = config('SECRET_KEY', default='django-insecure-change-this-in-production')
@@ -22,6 +24,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -52,13 +55,128 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
-DATABASES = {
+# DB_ENGINE=sqlite (default, single node) or postgres (production).
+# SQLite runs in WAL mode so readers don't block the writer, starts transactions
+# with BEGIN IMMEDIATE (see config/sqlite/base.py) and waits up to DB_SQLITE_TIMEOUT
+# seconds for the write lock instead of failing with "database is locked".
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME', default='globalfund'),
+            'USER': config('DB_USER', default='postgres'),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+            # Persistent connections, checked before reuse so a dropped one is replaced transparently
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+            'OPTIONS': {
+                'connect_timeout': config('DB_CONNECT_TIMEOUT', default=5, cast=int),
+            },
+        }
+    }
+    
+    # DB_POOL=pgbouncer: behind PgBouncer in transaction mode (no server-side cursors, short-lived connections)
+    # DB_POOL=native: psycopg 3 connection pool in each worker (Django 5.1+)
+    DB_POOL = config('DB_POOL', default='none')
+    if DB_POOL == 'pgbouncer':
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+    elif DB_POOL == 'native':
+        if django.VERSION < (5, 1):
+            raise ImproperlyConfigured('DB_POOL=native needs Django 5.1+; use DB_POOL=pgbouncer')
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'config.sqlite',
+            'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+            'TRANSACTION_MODE': config('DB_SQLITE_TRANSACTION_MODE', default='IMMEDIATE'),
+            'OPTIONS': {
+                'timeout': config('DB_SQLITE_TIMEOUT', default=20, cast=float),
+            },
+            # A file rather than shared-cache memory, so concurrent tests lock the way production does
+            'TEST': {
+                'NAME': config('DB_TEST_NAME', default=str(BASE_DIR / 'test_db.sqlite3')),
+            },
+        }
+    }
+
+# Applied on each new SQLite connection by api.db.configure_sqlite
+SQLITE_JOURNAL_MODE = config('DB_SQLITE_JOURNAL_MODE', default='WAL')
+SQLITE_SYNCHRONOUS = config('DB_SQLITE_SYNCHRONOUS', default='')
+
+# Locmem by default; point CACHE_BACKEND/CACHE_LOCATION at e.g.
+# django.core.cache.backends.redis.RedisCache and redis://host:6379/0 to share across nodes
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='globalfund'),
     }
 }
 
+API_CACHE_TIMEOUT = config('API_CACHE_TIMEOUT', default=300, cast=int)
+
+# Cache-Control for conditional GET routes (api.conditional), by URL name; async twins share them.
+# Public routes may be served by a CDN for max-age and revalidated with the ETag after that;
+# donations carry donor e-mails, so browsers may keep them but must revalidate and shared caches may not.
+API_CACHE_CONTROL = {
+    'organization-list': 'public, max-age=30, stale-while-revalidate=60',
+    'organization-detail': 'public, max-age=10, stale-while-revalidate=30',
+    'organization-updates': 'public, max-age=30, stale-while-revalidate=60',
+    'organization-timeseries': 'public, max-age=60, stale-while-revalidate=120',
+    'organization-category-timeseries': 'public, max-age=60, stale-while-revalidate=120',
+    'donation-list': 'private, no-cache',
+    'donation-detail': 'private, no-cache',
+    'donation-stats': 'public, max-age=10, stale-while-revalidate=30',
+}
+
+# On-chain receipt verification for donation completion
+CHAIN_RPC_URL = config('CHAIN_RPC_URL', default='http://localhost:8545')
+CHAIN_VERIFY_RECEIPTS = config('CHAIN_VERIFY_RECEIPTS', default=False, cast=bool)
+CHAIN_RPC_TIMEOUT = config('CHAIN_RPC_TIMEOUT', default=5.0, cast=float)
+CHAIN_RECEIPT_CACHE_TTL = config('CHAIN_RECEIPT_CACHE_TTL', default=600, cast=int)
+CHAIN_RECEIPT_CACHE_SIZE = config('CHAIN_RECEIPT_CACHE_SIZE', default=10000, cast=int)
+CHAIN_MIN_CONFIRMATIONS = config('CHAIN_MIN_CONFIRMATIONS', default=1, cast=int)
+
+# Donation token, checked by the receipt verifier and scanned by the index_chain command
+CHAIN_TOKEN_ADDRESS = config('CHAIN_TOKEN_ADDRESS', default='0xfdcC3dd6671eaB0709A4C0f3F53De9a333d80798')
+CHAIN_TOKEN_DECIMALS = config('CHAIN_TOKEN_DECIMALS', default=18, cast=int)
+CHAIN_REORG_DEPTH = config('CHAIN_REORG_DEPTH', default=12, cast=int)
+
+# Request metrics (api.metrics.MetricsMiddleware, scraped from /api/metrics/)
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_SERVER_TIMING = config('METRICS_SERVER_TIMING', default=True, cast=bool)
+METRICS_QUERY_THRESHOLD = config('METRICS_QUERY_THRESHOLD', default=20, cast=int)
+# Per-route budgets (by URL name) for writes whose query count is fixed by design rather than by page size:
+# one completion is 20 queries; a batch costs ~8 per organization touched (~170 for 20), however many items;
+# bulk ingest is a few queries per 500 rows, plus the batch cost above for rows that arrive completed
+METRICS_QUERY_BUDGETS = {
+    'donation-complete': 22,
+    'donation-complete-batch': 200,
+    'donation-bulk': 50,
+}
+
+# Readiness probes (api.health, served from /api/health/ready/)
+HEALTH_CACHE_TTL = config('HEALTH_CACHE_TTL', default=5.0, cast=float)
+HEALTH_PROBE_TIMEOUT = config('HEALTH_PROBE_TIMEOUT', default=2.0, cast=float)
+HEALTH_CHECK_CHAIN = config('HEALTH_CHECK_CHAIN', default=CHAIN_VERIFY_RECEIPTS, cast=bool)
+
+# Live donation feed (api.live, served over SSE from /api/async/live/ under ASGI)
+LIVE_BROKER = config('LIVE_BROKER', default='local')  # local, redis, or a dotted path to a broker class
+LIVE_BROKER_URL = config('LIVE_BROKER_URL', default='redis://localhost:6379/0')
+LIVE_QUEUE_SIZE = config('LIVE_QUEUE_SIZE', default=100, cast=int)
+LIVE_HEARTBEAT = config('LIVE_HEARTBEAT', default=15.0, cast=float)
+LIVE_RETRY_MS = config('LIVE_RETRY_MS', default=3000, cast=int)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -84,12 +202,15 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# orjson-backed JSON (falls back to the stdlib encoder when orjson isn't installed)
+API_FAST_JSON = config('API_FAST_JSON', default=True, cast=bool)
+
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'api.renderers.ORJSONRenderer' if API_FAST_JSON else 'rest_framework.renderers.JSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'api.parsers.ORJSONParser' if API_FAST_JSON else 'rest_framework.parsers.JSONParser',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
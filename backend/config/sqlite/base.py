@@ -0,0 +1,23 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite backend whose transactions take the write lock up front.
+
+    A plain BEGIN is deferred: a transaction that reads and then writes
+    (select_for_update, then update) has to upgrade its lock and fails with
+    "database is locked" at once, without waiting out the busy timeout, if
+    another writer got there first. With BEGIN IMMEDIATE the contention is on
+    BEGIN, which does honour the busy timeout. Django 5.1 exposes this as
+    OPTIONS['transaction_mode'].
+    """
+
+    def _start_transaction_under_autocommit(self):
+        mode = (self.settings_dict.get('TRANSACTION_MODE') or 'DEFERRED').upper()
+        if mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(f"TRANSACTION_MODE must be one of {', '.join(TRANSACTION_MODES)}")
+        self.cursor().execute(f'BEGIN {mode}')
@@ -0,0 +1,60 @@
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def seed_global_stats(apps, schema_editor):
+    Donation = apps.get_model('donations', 'Donation')
+    GlobalDonor = apps.get_model('donations', 'GlobalDonor')
+    GlobalStats = apps.get_model('donations', 'GlobalStats')
+    Organization = apps.get_model('organizations', 'Organization')
+    
+    completed = Donation.objects.filter(status='completed')
+    wallets = set(completed.values_list('donor_wallet', flat=True).distinct())
+    GlobalDonor.objects.bulk_create([GlobalDonor(donor_wallet=wallet) for wallet in wallets])
+    
+    totals = completed.aggregate(amount=Sum('amount'), amount_usd=Sum('amount_usd'))
+    GlobalStats.objects.create(
+        pk=1,
+        total_amount=totals['amount'] or 0,
+        total_amount_usd=totals['amount_usd'] or 0,
+        total_donations=completed.count(),
+        unique_donors=len(wallets),
+        organizations_count=Organization.objects.count(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0001_initial'),
+        ('organizations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GlobalDonor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('donor_wallet', models.CharField(max_length=42, unique=True)),
+                ('first_seen_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='GlobalStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_amount', models.DecimalField(decimal_places=18, default=0, max_digits=38)),
+                ('total_amount_usd', models.DecimalField(decimal_places=2, default=0, max_digits=30)),
+                ('total_donations', models.BigIntegerField(default=0)),
+                ('unique_donors', models.BigIntegerField(default=0)),
+                ('organizations_count', models.BigIntegerField(default=0)),
+                ('version', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name_plural': 'global stats',
+            },
+        ),
+        migrations.RunPython(seed_global_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Concat, Lower
+
+
+def normalize_donor_wallets(apps, schema_editor):
+    Donation = apps.get_model('donations', 'Donation')
+    GlobalDonor = apps.get_model('donations', 'GlobalDonor')
+    GlobalStats = apps.get_model('donations', 'GlobalStats')
+    Organization = apps.get_model('organizations', 'Organization')
+    OrganizationDonor = apps.get_model('organizations', 'OrganizationDonor')
+    
+    Donation.objects.update(donor_wallet=Lower('donor_wallet'))
+    Donation.objects.exclude(donor_wallet='').exclude(donor_wallet__startswith='0x').update(
+        donor_wallet=Concat(Value('0x'), 'donor_wallet')
+    )
+    
+    # Mixed-case duplicates collapse into one donor, so rebuild the seen tables and counts
+    completed = Donation.objects.filter(status='completed')
+    pairs = completed.values_list('organization_id', 'donor_wallet').distinct()
+    OrganizationDonor.objects.all().delete()
+    OrganizationDonor.objects.bulk_create(
+        [OrganizationDonor(organization_id=org_id, donor_wallet=wallet) for org_id, wallet in pairs]
+    )
+    Organization.objects.update(donor_count=Coalesce(Subquery(
+        OrganizationDonor.objects.filter(organization=OuterRef('pk'))
+        .values('organization').annotate(n=Count('id')).values('n')
+    ), 0))
+    
+    wallets = set(completed.values_list('donor_wallet', flat=True).distinct())
+    GlobalDonor.objects.all().delete()
+    GlobalDonor.objects.bulk_create([GlobalDonor(donor_wallet=wallet) for wallet in wallets])
+    GlobalStats.objects.update(unique_donors=len(wallets), version=F('version') + 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0002_globalstats'),
+        ('organizations', '0002_organizationdonor'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['organization', 'status', '-created_at'], name='donation_org_status_created'),
+        ),
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['status', '-created_at'], name='donation_status_created'),
+        ),
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['donor_wallet', '-created_at'], name='donation_wallet_created'),
+        ),
+        migrations.RunPython(normalize_donor_wallets, migrations.RunPython.noop),
+    ]
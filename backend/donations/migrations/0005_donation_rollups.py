@@ -0,0 +1,76 @@
+import django.db.models.deletion
+from collections import defaultdict
+from datetime import timezone
+from django.db import migrations, models
+
+
+def backfill_rollups(apps, schema_editor):
+    Donation = apps.get_model('donations', 'Donation')
+    DonationRollup = apps.get_model('donations', 'DonationRollup')
+    DonationRollupDonor = apps.get_model('donations', 'DonationRollupDonor')
+    
+    totals = defaultdict(lambda: [0, 0, 0, set()])
+    rows = Donation.objects.filter(status='completed').values_list(
+        'organization_id', 'donor_wallet', 'amount', 'amount_usd', 'completed_at', 'created_at'
+    )
+    for org_id, wallet, amount, amount_usd, completed_at, created_at in rows.iterator():
+        hour = (completed_at or created_at).astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        for key in ((org_id, 'hour', hour), (org_id, 'day', hour.replace(hour=0))):
+            total = totals[key]
+            total[0] += amount
+            total[1] += amount_usd or 0
+            total[2] += 1
+            total[3].add(wallet)
+    
+    for (org_id, granularity, bucket), (amount, amount_usd, count, wallets) in totals.items():
+        rollup = DonationRollup.objects.create(
+            organization_id=org_id, granularity=granularity, bucket=bucket,
+            amount=amount, amount_usd=amount_usd, donation_count=count, donor_count=len(wallets)
+        )
+        DonationRollupDonor.objects.bulk_create(
+            [DonationRollupDonor(rollup=rollup, donor_wallet=wallet) for wallet in wallets]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0004_keyset_indexes'),
+        ('organizations', '0004_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DonationRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=4)),
+                ('bucket', models.DateTimeField()),
+                ('amount', models.DecimalField(decimal_places=18, default=0, max_digits=38)),
+                ('amount_usd', models.DecimalField(decimal_places=2, default=0, max_digits=30)),
+                ('donation_count', models.BigIntegerField(default=0)),
+                ('donor_count', models.BigIntegerField(default=0)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='organizations.organization')),
+            ],
+            options={
+                'ordering': ['bucket'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DonationRollupDonor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('donor_wallet', models.CharField(max_length=42)),
+                ('rollup', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='donors', to='donations.donationrollup')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='donationrollup',
+            constraint=models.UniqueConstraint(fields=('organization', 'granularity', 'bucket'), name='unique_rollup_bucket'),
+        ),
+        migrations.AddConstraint(
+            model_name='donationrollupdonor',
+            constraint=models.UniqueConstraint(fields=('rollup', 'donor_wallet'), name='unique_rollup_donor_wallet'),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+from collections import defaultdict
+from django.db import migrations, models
+from donations.hll import HyperLogLog
+
+
+def backfill_sketches(apps, schema_editor):
+    DonationRollup = apps.get_model('donations', 'DonationRollup')
+    DonationRollupDonor = apps.get_model('donations', 'DonationRollupDonor')
+    
+    sketches = defaultdict(HyperLogLog)
+    for rollup_id, wallet in DonationRollupDonor.objects.values_list('rollup_id', 'donor_wallet').iterator():
+        sketches[rollup_id].add(wallet)
+    for rollup_id, sketch in sketches.items():
+        DonationRollup.objects.filter(pk=rollup_id).update(donor_sketch=sketch.to_bytes())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0005_donation_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donationrollup',
+            name='donor_sketch',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.RunPython(backfill_sketches, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+from donations.hll import HyperLogLog
+
+
+def count_from_sketches(apps, schema_editor):
+    DonationRollup = apps.get_model('donations', 'DonationRollup')
+
+    # donor_count becomes the sketch estimate, as completions now write it
+    for rollup_id, sketch in DonationRollup.objects.values_list('id', 'donor_sketch').iterator():
+        DonationRollup.objects.filter(pk=rollup_id).update(donor_count=HyperLogLog.from_bytes(sketch).count())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0006_rollup_donor_sketch'),
+    ]
+
+    operations = [
+        migrations.RunPython(count_from_sketches, migrations.RunPython.noop),
+        migrations.DeleteModel(
+            name='DonationRollupDonor',
+        ),
+    ]
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent after a donation transitions to completed and its organization's stats are applied.
+# Bulk paths send it once per batch with donation=None, the touched organization ids and the
+# completed donations as donations=[...].
+donation_completed = Signal()
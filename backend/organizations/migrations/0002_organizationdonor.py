@@ -0,0 +1,39 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def backfill_donors(apps, schema_editor):
+    Donation = apps.get_model('donations', 'Donation')
+    OrganizationDonor = apps.get_model('organizations', 'OrganizationDonor')
+    
+    pairs = Donation.objects.filter(status='completed').values_list('organization_id', 'donor_wallet').distinct()
+    OrganizationDonor.objects.bulk_create(
+        [OrganizationDonor(organization_id=org_id, donor_wallet=wallet) for org_id, wallet in pairs],
+        ignore_conflicts=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0001_initial'),
+        ('donations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrganizationDonor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('donor_wallet', models.CharField(max_length=42)),
+                ('first_seen_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seen_donors', to='organizations.organization')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='organizationdonor',
+            constraint=models.UniqueConstraint(fields=('organization', 'donor_wallet'), name='unique_org_donor_wallet'),
+        ),
+        migrations.RunPython(backfill_donors, migrations.RunPython.noop),
+    ]
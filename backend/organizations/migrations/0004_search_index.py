@@ -0,0 +1,30 @@
+from django.db import migrations
+from organizations.search import get_backend
+
+
+def create_search_index(apps, schema_editor):
+    backend = get_backend(schema_editor.connection.vendor)
+    if backend is None:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        backend.create_index(cursor)
+    backend.rebuild()
+
+
+def drop_search_index(apps, schema_editor):
+    backend = get_backend(schema_editor.connection.vendor)
+    if backend is None:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        backend.drop_index(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,30 @@
+from collections import defaultdict
+from django.db import migrations, models
+from donations.hll import HyperLogLog
+
+
+def backfill_sketches(apps, schema_editor):
+    Organization = apps.get_model('organizations', 'Organization')
+    OrganizationDonor = apps.get_model('organizations', 'OrganizationDonor')
+    
+    sketches = defaultdict(HyperLogLog)
+    for org_id, wallet in OrganizationDonor.objects.values_list('organization_id', 'donor_wallet').iterator():
+        sketches[org_id].add(wallet)
+    for org_id, sketch in sketches.items():
+        Organization.objects.filter(pk=org_id).update(donor_sketch=sketch.to_bytes())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0004_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organization',
+            name='donor_sketch',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.RunPython(backfill_sketches, migrations.RunPython.noop),
+    ]
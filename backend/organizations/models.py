@@ -1,6 +1,9 @@
-from django.db import models
+from collections import defaultdict
+from django.db import models, transaction
+from django.db.models import F, Sum
 from django.utils import timezone
-from donations.models import Donation
+from donations.hll import HyperLogLog, merge_into_sketch
+from donations.models import Donation, insert_new, reconcile_donors
 class Organization(models.Model):
     CATEGORIES = [
         ('water', 'Water & Sanitation'),
@@ -24,6 +27,7 @@ class Organization(models.Model):
     raised_amount = models.DecimalField(max_digits=20, decimal_places=2, default=0)
     
     donor_count = models.IntegerField(default=0)
+    donor_sketch = models.BinaryField(default=b'', editable=False)
     
     image_emoji = models.CharField(max_length=10, default='🌍')
     verified = models.BooleanField(default=False)
@@ -35,15 +39,93 @@ class Organization(models.Model):
     
     class Meta:
         ordering = ['-featured', '-created_at']
+        indexes = [
+            models.Index(fields=['-featured', '-created_at', '-id'], name='org_feed_keyset'),
+        ]
         
     def __str__(self):
         return self.name
     
     def update_stats(self):
+        """Recompute stats from scratch (used for reconciliation)"""
         donations = Donation.objects.filter(organization=self, status='completed')
-        self.raised_amount = sum(d.amount for d in donations)
-        self.donor_count = donations.values('donor_wallet').distinct().count()
-        self.save()
+        donors = OrganizationDonor.objects.filter(organization=self)
+        
+        self.donor_count = reconcile_donors(
+            donors,
+            donations.values_list('donor_wallet', flat=True),
+            lambda wallet: OrganizationDonor(organization=self, donor_wallet=wallet)
+        )
+        self.raised_amount = donations.aggregate(total=Sum('amount'))['total'] or 0
+        self.donor_sketch = HyperLogLog().update(
+            donors.values_list('donor_wallet', flat=True).iterator(chunk_size=2000)
+        ).to_bytes()
+        self.save(update_fields=['raised_amount', 'donor_count', 'donor_sketch', 'updated_at'])
+    
+    def apply_donation(self, donation):
+        """Apply a completed donation as an atomic delta on raised_amount/donor_count"""
+        Organization.apply_donations([donation])
+        self.refresh_from_db(fields=['raised_amount', 'donor_count', 'donor_sketch', 'updated_at'])
+    
+    @classmethod
+    def apply_donations(cls, donations):
+        """Apply a batch of completed donations as one delta per organization"""
+        by_org = defaultdict(list)
+        for donation in donations:
+            by_org[donation.organization_id].append(donation)
+        
+        # One transaction with the caller's (savepoint=False: no SAVEPOINT/RELEASE per organization)
+        with transaction.atomic(savepoint=False):
+            for org_id, org_donations in sorted(by_org.items()):
+                # Count only the rows this transaction inserted: a wallet a concurrent completion
+                # claimed first is that completion's new donor, not ours. Sorted so concurrent
+                # inserts of the same wallets take the unique-index locks in one order.
+                wallets = sorted({donation.donor_wallet for donation in org_donations})
+                new_wallets = [wallet for wallet, in insert_new(
+                    OrganizationDonor,
+                    [OrganizationDonor(organization_id=org_id, donor_wallet=wallet) for wallet in wallets],
+                    ['donor_wallet']
+                )]
+                
+                cls.objects.filter(pk=org_id).update(
+                    raised_amount=F('raised_amount') + sum(donation.amount for donation in org_donations),
+                    donor_count=F('donor_count') + len(new_wallets),
+                    updated_at=timezone.now()
+                )
+                # A wallet already in the sketch cannot change it
+                if new_wallets:
+                    merge_into_sketch(cls, org_id, new_wallets)
+        return list(by_org)
+    
+    @classmethod
+    def unique_donors(cls, queryset, exact=False):
+        """
+        Distinct donors across the organizations in queryset.
+
+        Approximate mode merges the per-organization sketches (about 1.6%
+        standard error) without touching donor rows; exact mode counts
+        distinct wallets in OrganizationDonor, for audits.
+        """
+        if exact:
+            return OrganizationDonor.objects.filter(
+                organization__in=queryset
+            ).values('donor_wallet').distinct().count()
+        return HyperLogLog.union(queryset.values_list('donor_sketch', flat=True)).count()
+
+
+class OrganizationDonor(models.Model):
+    """Wallets that have completed at least one donation to an organization"""
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='seen_donors')
+    donor_wallet = models.CharField(max_length=42)
+    first_seen_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['organization', 'donor_wallet'], name='unique_org_donor_wallet'),
+        ]
+        
+    def __str__(self):
+        return f"{self.organization.name} - {self.donor_wallet}"
 
 
 class OrganizationImpact(models.Model):
@@ -0,0 +1,143 @@
+import re
+from django.db import connection
+from django.db.models import Q
+
+FTS_TABLE = 'organizations_organization_fts'
+ORG_TABLE = 'organizations_organization'
+SEARCH_FIELDS = ('name', 'description', 'long_description', 'location')
+
+# Weighted so that name hits outrank hits buried in the long description
+SQLITE_WEIGHTS = (10.0, 4.0, 1.0, 2.0)
+POSTGRES_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(location, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(long_description, '')), 'C')"
+)
+
+
+def _tokens(term):
+    return re.findall(r'\w+', term.lower())
+
+
+class SQLiteSearchBackend:
+    """FTS5 virtual table keyed by organization id"""
+
+    def create_index(self, cursor):
+        columns = ', '.join(SEARCH_FIELDS)
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            f"USING fts5({columns}, tokenize='porter unicode61')"
+        )
+
+    def drop_index(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+    def index(self, organizations):
+        rows = [
+            (org.id,) + tuple(getattr(org, field) or '' for field in SEARCH_FIELDS)
+            for org in organizations
+        ]
+        if not rows:
+            return
+
+        placeholders = ', '.join(['%s'] * (len(SEARCH_FIELDS) + 1))
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(row[0],) for row in rows])
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(SEARCH_FIELDS)}) VALUES ({placeholders})",
+                rows
+            )
+
+    def remove(self, org_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk in org_ids])
+
+    def rebuild(self):
+        columns = ', '.join(SEARCH_FIELDS)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, {columns}) "
+                f"SELECT id, {columns} FROM organizations_organization"
+            )
+
+    def search(self, queryset, term):
+        tokens = _tokens(term)
+        if not tokens:
+            return queryset.none()
+
+        # Quote every token so user input can't inject FTS5 query syntax; prefix-match the last one
+        match = ' '.join(f'"{token}"' for token in tokens) + '*'
+        weights = ', '.join(str(w) for w in SQLITE_WEIGHTS)
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE} MATCH %s', f'{FTS_TABLE}.rowid = {ORG_TABLE}.id'],
+            params=[match],
+            select={'search_rank': f'bm25({FTS_TABLE}, {weights})'},
+            order_by=['search_rank', 'id'],
+        )
+
+
+class PostgresSearchBackend:
+    """Stored, generated tsvector column with a GIN index; Postgres keeps it in sync"""
+
+    def create_index(self, cursor):
+        cursor.execute(
+            "ALTER TABLE organizations_organization ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS ({POSTGRES_VECTOR}) STORED"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS organizations_organization_search_idx "
+            "ON organizations_organization USING GIN (search_vector)"
+        )
+
+    def drop_index(self, cursor):
+        cursor.execute("DROP INDEX IF EXISTS organizations_organization_search_idx")
+        cursor.execute("ALTER TABLE organizations_organization DROP COLUMN IF EXISTS search_vector")
+
+    def index(self, organizations):
+        pass
+
+    def remove(self, org_ids):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def search(self, queryset, term):
+        tokens = _tokens(term)
+        if not tokens:
+            return queryset.none()
+
+        query = ' & '.join(tokens[:-1] + [tokens[-1] + ':*'])
+        return queryset.extra(
+            where=[f"{ORG_TABLE}.search_vector @@ to_tsquery('english', %s)"],
+            params=[query],
+            select={'search_rank': f"ts_rank_cd({ORG_TABLE}.search_vector, to_tsquery('english', %s))"},
+            select_params=[query],
+            order_by=['-search_rank', 'id'],
+        )
+
+
+def get_backend(vendor=None):
+    vendor = vendor or connection.vendor
+    if vendor == 'sqlite':
+        return SQLiteSearchBackend()
+    if vendor == 'postgresql':
+        return PostgresSearchBackend()
+    return None
+
+
+def search_organizations(queryset, term):
+    """
+    Filter a queryset to full-text matches for term, best match first.
+
+    The match is joined into the queryset's own SQL, so the caller's
+    filters, the paginator's COUNT and the page slice all apply to every
+    match rather than to a prefetched list of top-ranked ids.
+    """
+    backend = get_backend()
+    if backend is None:
+        return queryset.filter(Q(name__icontains=term) | Q(description__icontains=term))
+    return backend.search(queryset, term)
@@ -0,0 +1,31 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from donations.models import GlobalStats
+from .models import Organization
+from .search import get_backend
+
+@receiver(post_save, sender=Organization)
+def organization_saved(sender, instance, created, **kwargs):
+    # GlobalStats.version also validates the organization list and category responses, so edits move it too
+    if created:
+        GlobalStats.bump(organizations_count=1)
+    else:
+        GlobalStats.bump()
+
+@receiver(post_delete, sender=Organization)
+def organization_deleted(sender, instance, **kwargs):
+    GlobalStats.bump(organizations_count=-1)
+
+@receiver(post_save, sender=Organization)
+def index_organization(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not {'name', 'description', 'long_description', 'location'} & set(update_fields):
+        return
+    backend = get_backend()
+    if backend:
+        backend.index([instance])
+
+@receiver(post_delete, sender=Organization)
+def unindex_organization(sender, instance, **kwargs):
+    backend = get_backend()
+    if backend:
+        backend.remove([instance.pk])
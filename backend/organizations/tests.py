@@ -0,0 +1,44 @@
+from django.test import TestCase
+from api.views import filter_organizations
+from organizations.models import Organization
+from organizations.search import get_backend
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # 600 strong matches (term in the name) and 5 weak ones (term in the description only)
+        Organization.objects.bulk_create([
+            Organization(
+                name=f'Solar Power {index}', category='environment', location='Kenya',
+                description='Panels for schools', wallet_address='0x%040x' % index,
+            )
+            for index in range(600)
+        ] + [
+            Organization(
+                name=f'Village School {index}', category='education', location='Peru',
+                description='Solar lamps for homework', wallet_address='0x%040x' % (1000 + index),
+            )
+            for index in range(5)
+        ])
+        backend = get_backend()
+        if backend is not None:
+            backend.rebuild()
+
+    def search(self, **params):
+        return filter_organizations(Organization.objects.all(), params)
+
+    def test_counts_every_match(self):
+        self.assertEqual(self.search(search='solar').count(), 605)
+
+    def test_filters_apply_before_ranking(self):
+        # The weak matches rank below all 600 strong ones but must survive the category filter
+        results = self.search(search='solar', category='education')
+        self.assertEqual(results.count(), 5)
+        self.assertTrue(all(org.category == 'education' for org in results))
+
+    def test_best_match_first(self):
+        self.assertTrue(self.search(search='solar')[0].name.startswith('Solar Power'))
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual(self.search(search='" OR name:').count(), 0)
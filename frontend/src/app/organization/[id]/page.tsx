@@ -49,6 +49,14 @@ export default function OrganizationDetailPage() {
     }
   }, [params.id]);
 
+  // Raised/donor totals pushed by an ASGI backend as donations complete, instead of refetching (see subscribeToOrganization)
+  useEffect(() => {
+    if (!params.id) return;
+    return apiClient.subscribeToOrganization(params.id as string, (totals) => {
+      setOrganization((current) => current && { ...current, raised: Number(totals.raised), donors: totals.donors });
+    });
+  }, [params.id]);
+
   // Clear status message after 5 seconds
   useEffect(() => {
     if (statusMessage) {
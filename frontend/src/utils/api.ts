@@ -1,4 +1,6 @@
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/api';
+// The live feed is only served by the ASGI backend (uvicorn config.asgi); a WSGI server answers 503
+const LIVE_UPDATES = process.env.NEXT_PUBLIC_LIVE_UPDATES === 'true';
 
 export interface Organization {
   id: string;
@@ -49,6 +51,14 @@ export interface DonationStats {
   organizations_count: number;
 }
 
+export interface OrganizationTotals {
+  id: number;
+  raised: string;
+  donors: number;
+  raised_delta: string;
+  donations_delta: number;
+}
+
 class APIClient {
   private baseURL: string;
 
@@ -172,6 +182,19 @@ class APIClient {
     });
   }
 
+  // Live updates over Server-Sent Events; returns a function that closes the stream.
+  // A no-op unless NEXT_PUBLIC_LIVE_UPDATES=true, i.e. the backend runs under ASGI.
+  subscribeToOrganization(id: string, onTotals: (totals: OrganizationTotals) => void): () => void {
+    if (!LIVE_UPDATES || typeof EventSource === 'undefined') {
+      return () => {};
+    }
+    const source = new EventSource(`${this.baseURL}/async/live/?organization=${encodeURIComponent(id)}`);
+    source.addEventListener('organization', (event) => {
+      onTotals(JSON.parse((event as MessageEvent).data));
+    });
+    return () => source.close();
+  }
+
   async getStats(): Promise<DonationStats> {
     return this.request('/stats/');
   }